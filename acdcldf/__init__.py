@@ -0,0 +1,3 @@
+"""
+Tools operating on the CLDF data of the ACD, e.g. lookup structures used by the `acd.*` commands.
+"""
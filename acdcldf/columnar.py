@@ -0,0 +1,140 @@
+"""
+Export of the CLDF tables to typed columnar files - in the Arrow IPC file format (aka Feather v2) -
+and memory-mapped access to the columns of these files.
+
+- Columns are typed according to the CSVW datatypes of the CLDF metadata.
+- Columns with a separator - e.g. `Source` - are exported as list columns.
+- Columns with few distinct values - e.g. `Language_ID`, `Group` or `Category` - are
+  dictionary-encoded.
+
+Since the files are written uncompressed and as a single record batch, reading a column from a
+memory-mapped file does not copy (or even read) data of other columns.
+
+Requires `pyarrow`, see the `columnar` extra in `setup.py`.
+"""
+import pathlib
+
+import pyarrow as pa
+
+__all__ = ['export', 'read', 'load', 'DICTIONARY_COLUMNS']
+
+SUFFIX = '.arrow'
+# Names of columns which are dictionary-encoded:
+DICTIONARY_COLUMNS = {'Language_ID', 'Group', 'Category', 'Initial', 'Macroarea', 'Family'}
+TYPES = {
+    'boolean': pa.bool_(),
+    'integer': pa.int64(),
+    'decimal': pa.float64(),
+    'float': pa.float64(),
+    'double': pa.float64(),
+}
+
+
+def column_type(col):
+    """
+    :param col: `csvw.Column` instance.
+    :return: `pyarrow.DataType` for the column.
+    """
+    type_ = TYPES.get(col.datatype.base if col.datatype else None, pa.string())
+    if col.name in DICTIONARY_COLUMNS:
+        type_ = pa.dictionary(pa.int32(), type_)
+    if col.separator:
+        type_ = pa.list_(type_)
+    return type_
+
+
+def convert(value, type_):
+    if value is not None and type_ == pa.float64():
+        return float(value)
+    if value is not None and not isinstance(value, (str, bool, int, float, list)):
+        return str(value)
+    return value
+
+
+def table_path(d, table):
+    return pathlib.Path(d) / (pathlib.Path(str(table.url)).stem + SUFFIX)
+
+
+def export(cldf, d, tables=None, log=None):
+    """
+    Write the tables of `cldf` to `d`, one file per table, named after the CSV file.
+
+    :param tables: `list` of table names or component names to export, defaulting to all tables.
+    :return: `list` of paths of the files written.
+    """
+    d = pathlib.Path(d)
+    d.mkdir(parents=True, exist_ok=True)
+    res = []
+    for table in [cldf[t] for t in tables] if tables else cldf.tables:
+        try:
+            component = cldf.get_tabletype(table)
+        except ValueError:
+            component = None
+        cols = table.tableSchema.columns
+        types = [column_type(col) for col in cols]
+        data = [[] for _ in cols]
+        for row in table:
+            for i, (col, type_) in enumerate(zip(cols, types)):
+                value = row.get(col.name)
+                if col.separator:
+                    data[i].append(
+                        [convert(v, type_.value_type) for v in value] if value else [])
+                else:
+                    data[i].append(convert(value, type_))
+        schema = pa.schema(
+            [pa.field(col.name, type_) for col, type_ in zip(cols, types)],
+            metadata={'url': str(table.url), 'component': component or ''})
+        tab = pa.table([pa.array(vals, type=type_) for vals, type_ in zip(data, types)], schema)
+
+        path = table_path(d, table)
+        tmp = path.parent / (path.name + '.tmp')
+        with pa.OSFile(str(tmp), 'wb') as sink:
+            with pa.ipc.new_file(sink, schema) as writer:
+                writer.write_table(tab, max_chunksize=max(tab.num_rows, 1))
+        tmp.replace(path)
+        res.append(path)
+        if log:
+            log.info('{}: {} rows'.format(path, tab.num_rows))
+    return res
+
+
+def read(d, table, columns=None):
+    """
+    Read a table exported with `export` from a memory-mapped file.
+
+    :param table: Name of the CSV file (e.g. `etyma.csv`), file stem or CLDF component name.
+    :param columns: `list` of names of the columns to read, defaulting to all columns.
+    :return: `pyarrow.Table`
+    """
+    d = pathlib.Path(d)
+    path = d / (pathlib.Path(table).stem + SUFFIX)
+    if not path.exists():
+        for p in sorted(d.glob('*' + SUFFIX)):
+            with pa.memory_map(str(p)) as source:
+                if pa.ipc.open_file(source).schema.metadata.get(b'component') == table.encode():
+                    path = p
+                    break
+        else:
+            raise ValueError('No columnar file for table {} in {}'.format(table, d))
+    tab = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    return tab.select(columns) if columns else tab
+
+
+def load(d, table, columns=None):
+    """
+    :return: `dict` mapping column names to `pyarrow.Array`s - backed by the memory-mapped file. \
+    Columns of files with more than one record batch are returned as `pyarrow.ChunkedArray`s.
+
+    Usage:
+
+    >>> import pyarrow.compute as pc
+    >>> cols = load('columnar', 'LanguageTable', ['ID', 'Group'])
+    >>> pc.value_counts(cols['Group'])
+    """
+    tab = read(d, table, columns=columns)
+    res = {}
+    for name in tab.column_names:
+        col = tab.column(name)
+        # Combining chunks would copy the data out of the memory map:
+        res[name] = col.chunk(0) if col.num_chunks == 1 else col
+    return res
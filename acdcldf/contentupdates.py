@@ -0,0 +1,814 @@
+"""
+Application of the tabular content updates - as provided in `raw/2023-04 Content Updates/` - to
+the CLDF data.
+
+Each file of a batch lists operations of one type - e.g. "Add Word To Entry" or "Delete Entry" -
+one per row. Rows are parsed into typed operations, which are applied to an `Index` of the CLDF
+tables, built once. Operations are applied in the order of `OPERATIONS` - and within a type in the
+order of the rows -, each looking up its targets in constant time. Only the changed tables are
+written back.
+
+Targets are referenced by entry ID, i.e. by etymon ID, optionally followed by the ID of a
+reconstruction (which is also the ID of its row in CognateTable), like `32925#s-11390`, and words
+by language ID and word ID, which together make up the form ID.
+
+Operations which cannot be applied - because the targets do not exist (anymore), because the data
+does not match the expectations of the operation, or because the target entry is deleted by
+another operation in the batch - are not applied, but reported as `Conflict`s.
+
+Since `makecldf` re-creates the CLDF data from `raw/v1.2`, the batches of updates in `raw/` - i.e.
+directories named like "2023-04 Content Updates" - are applied by `makecldf`, see `apply_batches`.
+"""
+import re
+import abc
+import pathlib
+import hashlib
+import collections
+
+import attr
+from csvw.dsv import reader
+
+from acdcldf.tree import PROTO_TREE
+from acdcldf.graphemes import get_initial
+
+__all__ = [
+    'EntryID', 'Conflict', 'Index', 'OPERATIONS', 'read_operations', 'apply', 'batches',
+    'apply_batches']
+
+BATCH_DIR = '* Content Updates'
+ENTRY_ID_PATTERN = re.compile(r'(?P<etymon>[0-9]+)(#s-(?P<reconstruction>[0-9]+))?')
+TABLES = [
+    'LanguageTable', 'ParameterTable', 'FormTable', 'CognatesetTable', 'CognateTable',
+    'etyma.csv', 'cf.csv', 'cfitems.csv']
+
+EntryID = collections.namedtuple('EntryID', 'etymon reconstruction')
+
+
+def entry_id(s):
+    """
+    Converter for entry ID fields.
+
+    :return: `EntryID` or `None`, if `s` is empty.
+    """
+    s = (s or '').strip()
+    if not s:
+        return None
+    m = ENTRY_ID_PATTERN.fullmatch(s)
+    if not m:
+        raise ValueError('Invalid entry ID: {}'.format(s))
+    return EntryID(m.group('etymon'), m.group('reconstruction'))
+
+
+def text(s):
+    return (s or '').strip() or None
+
+
+def markdown(s):
+    # Asterisks in plain text must not be interpreted as Markdown emphasis:
+    return s.replace('*', '&ast;') if s else s
+
+
+def join(*chunks, sep=' '):
+    return sep.join(c.strip() for c in chunks if c and c.strip()) or None
+
+
+def initial(form):
+    try:
+        return get_initial(form)
+    except (AssertionError, IndexError):
+        raise Conflict('invalid reconstruction {}'.format(form))
+
+
+def hashed_id(*chunks):
+    return hashlib.md5('|'.join(chunks).encode('utf8')).hexdigest()
+
+
+class Conflict(Exception):
+    """
+    Raised when an operation cannot be applied.
+    """
+
+
+class Index:
+    """
+    The rows of the CLDF tables affected by content updates, indexed for constant time lookup of
+    the targets of operations.
+    """
+    def __init__(self, cldf, batch):
+        """
+        :param batch: Name of the batch of updates, e.g. "2023-04", used to create IDs of new \
+        cf sets.
+        """
+        self.cldf = cldf
+        self.batch = batch
+        self.rows = {t: collections.OrderedDict((r['ID'], r) for r in cldf[t]) for t in TABLES}
+        self.changed = set()
+
+        self.parameters = {r['Name']: pid for pid, r in self.rows['ParameterTable'].items()}
+        self.lexemes = collections.defaultdict(list)  # Forms by language ID and parameter ID.
+        for r in self.rows['FormTable'].values():
+            self.lexemes[r['Language_ID'], r['Parameter_ID']].append(r)
+        self.proto_languages = {
+            r['Abbr'].upper(): lid for lid, r in self.rows['LanguageTable'].items() if r['Abbr']}
+        self.cognatesets = collections.defaultdict(list)  # By etymon ID.
+        self.named_by = collections.defaultdict(list)  # Cognate sets by reconstruction form ID.
+        for r in self.rows['CognatesetTable'].values():
+            self.cognatesets[r['Etymon_ID']].append(r)
+            self.named_by[r['Form_ID']].append(r)
+        # Cognates by cognate set ID and form ID:
+        self.members = collections.defaultdict(dict)
+        # Number of cognates and cf items per form ID:
+        self.refs = collections.Counter()
+        for r in self.rows['CognateTable'].values():
+            self.members[r['Cognateset_ID']][r['Form_ID']] = r
+            self.refs[r['Form_ID']] += 1
+        self.cfsets = collections.defaultdict(list)  # By cognate set ID.
+        for r in self.rows['cf.csv'].values():
+            if r['Cognateset_ID']:
+                self.cfsets[r['Cognateset_ID']].append(r)
+        self.cfitems = collections.defaultdict(dict)  # By cf set ID and form ID.
+        for r in self.rows['cfitems.csv'].values():
+            self.cfitems[r['Cfset_ID']][r['Form_ID']] = r
+            self.refs[r['Form_ID']] += 1
+        # Reconstruction IDs are numeric:
+        self.next_id = max(
+            (int(cid) for cid in self.rows['CognateTable'] if cid.isdigit()), default=0) + 1
+
+    def get(self, table, id_, what=None):
+        if id_ not in self.rows[table]:
+            raise Conflict('{} {} not found'.format(what or table, id_))
+        return self.rows[table][id_]
+
+    def add(self, table, row):
+        if row['ID'] in self.rows[table]:
+            raise Conflict('{} {} exists'.format(table, row['ID']))
+        row = collections.OrderedDict(
+            [(col.name, row.get(col.name)) for col in self.cldf[table].tableSchema.columns])
+        self.rows[table][row['ID']] = row
+        self.changed.add(table)
+        return row
+
+    def update(self, table, row, **kw):
+        row.update(kw)
+        self.changed.add(table)
+
+    def delete(self, table, row):
+        del self.rows[table][row['ID']]
+        self.changed.add(table)
+
+    def new_id(self):
+        while str(self.next_id) in self.rows['CognateTable']:
+            self.next_id += 1
+        self.next_id += 1
+        return str(self.next_id - 1)
+
+    #
+    # Entries:
+    #
+    def etymon(self, entry):
+        return self.get('etyma.csv', entry.etymon, 'entry')
+
+    def main_cognateset(self, etymon_id):
+        for cs in self.cognatesets.get(etymon_id, []):
+            if cs['Is_Main_Entry']:
+                return cs
+        raise Conflict('entry {} has no main cognate set'.format(etymon_id))
+
+    def reconstruction(self, entry):
+        """
+        :return: pair (cognate set row, reconstruction ID) for an entry ID - defaulting to the \
+        main reconstruction of the etymon.
+        """
+        self.etymon(entry)
+        if entry.reconstruction:
+            cog = self.get('CognateTable', entry.reconstruction, 'reconstruction')
+            cs = self.rows['CognatesetTable'][cog['Cognateset_ID']]
+            if cs['Etymon_ID'] != entry.etymon:
+                raise Conflict('reconstruction {} not in entry {}'.format(
+                    entry.reconstruction, entry.etymon))
+            return cs, entry.reconstruction
+        cs = self.main_cognateset(entry.etymon)
+        cog = self.members[cs['ID']].get(cs['Form_ID'])
+        if not cog:
+            raise Conflict('no main reconstruction for entry {}'.format(entry.etymon))
+        return cs, cog['ID']
+
+    def commentable(self, entry):
+        """
+        :return: pair (table, row) of the object holding the note of an entry.
+        """
+        if entry.reconstruction:
+            return 'CognatesetTable', self.reconstruction(entry)[0]
+        return 'etyma.csv', self.etymon(entry)
+
+    def name_cognatesets(self, form):
+        lang = self.rows['LanguageTable'][form['Language_ID']]
+        for cs in self.named_by.get(form['ID'], []):
+            self.update(
+                'CognatesetTable',
+                cs,
+                Name="{} {} '{}'".format(lang['Abbr'], form['Value'], form['Description']))
+
+    #
+    # Words:
+    #
+    def form(self, language_id, word_id):
+        return self.get('FormTable', '{}-{}'.format(language_id, word_id), 'word')
+
+    def parameter(self, gloss):
+        """
+        :return: ID of the parameter for `gloss` - added to ParameterTable if necessary.
+        """
+        if gloss not in self.parameters:
+            self.parameters[gloss] = self.add(
+                'ParameterTable', dict(ID=hashed_id(gloss or ''), Name=gloss))['ID']
+        return self.parameters[gloss]
+
+    def lexeme(self, language_id, gloss, value):
+        """
+        :return: The form row with `value` for `gloss` in a language or `None`.
+        """
+        for form in self.lexemes.get((language_id, self.parameters.get(gloss)), []):
+            if form['Value'] == value and form['ID'] in self.rows['FormTable']:
+                return form
+
+    def add_form(self, language_id, gloss, value):
+        """
+        Add a form, numbered per language and parameter - like `pylexibank` does in `makecldf`.
+        """
+        pid = self.parameter(gloss)
+        forms = self.lexemes[language_id, pid]
+        n = len(forms) + 1
+        while '{}-{}-{}'.format(language_id, pid, n) in self.rows['FormTable']:
+            n += 1
+        form = self.add('FormTable', dict(
+            ID='{}-{}-{}'.format(language_id, pid, n),
+            Language_ID=language_id,
+            Parameter_ID=pid,
+            Value=value,
+            Form=value,
+            Description=gloss,
+            Source=[]))
+        forms.append(form)
+        return form
+
+    def set_cognacy(self, form, add=None, remove=None):
+        rids = set((form['Cognacy'] or '').split())
+        if add:
+            rids.add(add)
+        if remove:
+            rids.discard(remove)
+        self.update('FormTable', form, Cognacy=' '.join(sorted(rids, key=int)) or None)
+
+    def link(self, form, cs, cid):
+        cog = self.add('CognateTable', dict(
+            ID=cid, Form_ID=form['ID'], Cognateset_ID=cs['ID'], Metathesis=False,
+            Assimilation=False))
+        self.members[cs['ID']][form['ID']] = cog
+        self.refs[form['ID']] += 1
+        return cog
+
+    def unlink(self, table, row):
+        self.delete(table, row)
+        self.refs[row['Form_ID']] -= 1
+
+    def member(self, form, entry):
+        """
+        :return: triple (cognate set row, reconstruction ID, cognate row or `None`)
+        """
+        cs, rid = self.reconstruction(entry)
+        return cs, rid, self.members[cs['ID']].get(form['ID'])
+
+    def add_cognate(self, form, entry, cid=None):
+        cs, rid, cog = self.member(form, entry)
+        if cog:
+            raise Conflict('word {} already in entry {}'.format(form['ID'], cs['Etymon_ID']))
+        cog = self.link(form, cs, cid or '{}-{}'.format(rid, form['ID']))
+        self.set_cognacy(form, add=rid)
+        return cog
+
+    def remove_cognate(self, form, entry):
+        cs, rid, cog = self.member(form, entry)
+        if not cog:
+            raise Conflict('word {} not in entry {}'.format(form['ID'], cs['Etymon_ID']))
+        del self.members[cs['ID']][form['ID']]
+        self.unlink('CognateTable', cog)
+        self.set_cognacy(form, remove=rid)
+        return cog
+
+    def add_cfitem(self, form, cfset):
+        if form['ID'] not in self.cfitems[cfset['ID']]:
+            self.cfitems[cfset['ID']][form['ID']] = self.add('cfitems.csv', dict(
+                ID='{}-{}'.format(cfset['ID'], form['ID']),
+                Cfset_ID=cfset['ID'],
+                Form_ID=form['ID']))
+            self.refs[form['ID']] += 1
+
+    def cfset(self, id_, category, description):
+        if id_ not in self.rows['cf.csv']:
+            self.add('cf.csv', dict(ID=id_, Description=description, Category=category))
+        return self.rows['cf.csv'][id_]
+
+    def write(self):
+        for table in TABLES:
+            if table in self.changed:
+                self.cldf[table].common_props['dc:extent'] = \
+                    self.cldf[table].write(self.rows[table].values())
+        if self.changed:
+            # Update the row counts:
+            self.cldf.write_metadata()
+        return sorted(self.changed)
+
+
+def field(column, converter=text, required=False):
+    """
+    :param required: Flag signaling whether an operation with an empty value can be applied.
+    """
+    return attr.ib(
+        default=None, converter=converter, metadata=dict(column=column, required=required))
+
+
+def entry_field(column, required=True):
+    return field(column, converter=entry_id, required=required)
+
+
+@attr.s(frozen=True)
+class Operation(metaclass=abc.ABCMeta):
+    """
+    Operations are initialized from the rows of the update files, using the `metadata['column']`
+    of the attributes to map column names.
+    """
+    __title__ = None
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(**{f.name: row.get(f.metadata['column']) for f in attr.fields(cls)})
+
+    def destinations(self):
+        """
+        :return: `list` of `EntryID`s of entries the operation adds data to.
+        """
+        return []
+
+    def missing(self):
+        """
+        :return: `list` of names of required columns with empty values.
+        """
+        return [
+            f.metadata['column'] for f in attr.fields(self.__class__)
+            if f.metadata['required'] and getattr(self, f.name) is None]
+
+    @abc.abstractmethod
+    def apply(self, index):
+        """
+        Apply the operation to `index`.
+
+        :raises Conflict: If the operation cannot be applied.
+        """
+
+
+@attr.s(frozen=True)
+class AddParentEntry(Operation):
+    """
+    A new reconstruction is added as main entry above the existing subsets of an etymon, on the
+    level of the parent of the current main reconstruction in the tree of proto-languages.
+    Optionally, a word is moved from another entry to populate the new level.
+    """
+    __title__ = 'Add New Parent Entry'
+    entry = entry_field('Subentries ID')
+    form = field('Parent Entry (reconstruciton) form')
+    gloss = field('Parent Entry Gloss')
+    language_id = field('Language ID')
+    word_form = field('Word (reflex) form')
+    word_id = field('Word ID (if moving words to populate the new parent level)')
+    previous_entry = entry_field(
+        'Previous entry ID (if moving words to populate the new parent level)', required=False)
+
+    def destinations(self):
+        return [self.entry]
+
+    def apply(self, index):
+        etymon = index.etymon(self.entry)
+        init = initial(self.form)
+        main = index.main_cognateset(self.entry.etymon)
+        lid = index.rows['FormTable'][main['Form_ID']]['Language_ID']
+        plang = index.rows['LanguageTable'][lid]
+        abbr = (plang['Abbr'] or '').upper()
+        parents = [
+            name for name in (PROTO_TREE.ancestors(abbr, inclusive=False)
+                              if abbr in PROTO_TREE else ()) if name in index.proto_languages]
+        if not parents:
+            raise Conflict('no parent level for {}'.format(plang['Name']))
+        word, previous = None, None
+        if self.word_id:
+            if not self.previous_entry:
+                raise Conflict('no previous entry for word {}'.format(self.word_id))
+            word = index.form(self.language_id, self.word_id)
+            _, rid, cog = index.member(word, self.previous_entry)
+            if not cog:
+                raise Conflict('word {} not in entry {}'.format(
+                    word['ID'], self.previous_entry.etymon))
+            # Resolve the previous entry now, since the main reconstruction is about to change:
+            previous = EntryID(self.previous_entry.etymon, rid)
+
+        # Check the new rows before changing anything:
+        lid = index.proto_languages[parents[0]]
+        existing = index.lexeme(lid, self.gloss, self.form)
+        if existing:
+            raise Conflict('reconstruction {} exists'.format(existing['ID']))
+        subsets = [int(cs['ID'].partition('_')[2] or 0) for cs in index.cognatesets[etymon['ID']]]
+        csid = '{}_{}'.format(etymon['ID'], max(subsets, default=0) + 1)
+        if csid in index.rows['CognatesetTable']:
+            raise Conflict('cognate set {} exists'.format(csid))
+
+        form = index.add_form(lid, self.gloss, self.form)
+        cs = index.add('CognatesetTable', dict(
+            ID=csid,
+            Form_ID=form['ID'],
+            Etymon_ID=etymon['ID'],
+            Is_Main_Entry=True,
+            Source=[]))
+        index.update('CognatesetTable', main, Is_Main_Entry=False)
+        index.cognatesets[etymon['ID']].append(cs)
+        index.named_by[form['ID']].append(cs)
+        index.name_cognatesets(form)
+        index.link(form, cs, index.new_id())
+        index.update(
+            'etyma.csv', etymon,
+            Name=self.form,
+            Description=self.gloss or etymon['Description'],
+            Initial=init)
+        if word:
+            index.remove_cognate(word, previous)
+            index.add_cognate(word, EntryID(etymon['ID'], None))
+
+
+@attr.s(frozen=True)
+class AddWord(Operation):
+    __title__ = 'Add Word To Entry'
+    entry = entry_field('Entry ID')
+    language_id = field('Language ID')
+    word_form = field('Word Form')
+    gloss = field('Gloss')
+
+    def destinations(self):
+        return [self.entry]
+
+    def apply(self, index):
+        index.get('LanguageTable', self.language_id, 'language')
+        # An existing word with the same form and gloss is added to the entry:
+        form = index.lexeme(self.language_id, self.gloss, self.word_form)
+        # Check the entry first, so that a conflict doesn't leave an orphaned form:
+        cs, _, cog = index.member(form or dict(ID=None), self.entry)
+        if cog:
+            raise Conflict('word {} already in entry {}'.format(form['ID'], cs['Etymon_ID']))
+        index.add_cognate(
+            form or index.add_form(self.language_id, self.gloss, self.word_form), self.entry)
+
+
+@attr.s(frozen=True)
+class ChangeReconstruction(Operation):
+    """
+    Changes the form and/or gloss of an etymon or of a particular reconstruction. Empty fields
+    mean "unchanged".
+    """
+    __title__ = 'Change Reconstruction in Entry'
+    entry = entry_field('Entry ID')
+    form = field('New Form (reconstruction)')
+    gloss = field('New Gloss')
+
+    def apply(self, index):
+        if self.entry.reconstruction:
+            cs, rid = index.reconstruction(self.entry)
+            cog = index.rows['CognateTable'][rid]
+            form = index.rows['FormTable'][cog['Form_ID']]
+            if self.form:
+                index.update('FormTable', form, Value=self.form, Form=self.form)
+            if self.gloss:
+                index.update('FormTable', form, Description=self.gloss)
+            index.name_cognatesets(form)
+        else:
+            etymon = index.etymon(self.entry)
+            if self.form:
+                index.update('etyma.csv', etymon, Name=self.form, Initial=initial(self.form))
+            if self.gloss:
+                index.update('etyma.csv', etymon, Description=self.gloss)
+
+
+@attr.s(frozen=True)
+class ChangeWord(Operation):
+    """
+    Changes the form and/or gloss of a word. If the old form or gloss is given, it must match the
+    data.
+    """
+    __title__ = 'Change Word In Existing Entry'
+    entry = entry_field('Entry ID')
+    language_id = field('Language ID')
+    word_id = field('Word ID')
+    old_form = field('Old word form')
+    new_form = field('New word form')
+    old_gloss = field('old gloss')
+    new_gloss = field('New gloss')
+
+    def apply(self, index):
+        form = index.form(self.language_id, self.word_id)
+        if not index.member(form, self.entry)[2]:
+            raise Conflict('word {} not in entry {}'.format(form['ID'], self.entry.etymon))
+        changes = [
+            (self.old_form, self.new_form, ['Value', 'Form']),
+            (self.old_gloss, self.new_gloss, ['Description']),
+        ]
+        for old, _, cols in changes:
+            if old and form[cols[0]] != old:
+                raise Conflict('word {}: expected "{}", found "{}"'.format(
+                    form['ID'], old, form[cols[0]]))
+        for _, new, cols in changes:
+            if new:
+                index.update('FormTable', form, **{col: new for col in cols})
+
+
+@attr.s(frozen=True)
+class DeleteWord(Operation):
+    __title__ = 'Delete Word From Entry'
+    entry = entry_field('Entry ID')
+    language_id = field('Language ID')
+    word_id = field('Word ID')
+    word_form = field('Word form')
+
+    def apply(self, index):
+        index.remove_cognate(index.form(self.language_id, self.word_id), self.entry)
+
+
+@attr.s(frozen=True)
+class MoveWord(Operation):
+    __title__ = 'Move Word To Different Entry'
+    language_id = field('Language ID')
+    word_id = field('Word ID')
+    word_form = field('Word form')
+    entry = entry_field('Original Entry ID')
+    new_entry = entry_field('New Entry ID')
+
+    def destinations(self):
+        return [self.new_entry]
+
+    def apply(self, index):
+        form = index.form(self.language_id, self.word_id)
+        # Check the destination first, so that a conflict leaves the data unchanged:
+        if index.member(form, self.new_entry)[2]:
+            raise Conflict('word {} already in entry {}'.format(form['ID'], self.new_entry.etymon))
+        cog = index.remove_cognate(form, self.entry)
+        index.add_cognate(form, self.new_entry, cid=cog['ID'])
+
+
+@attr.s(frozen=True)
+class MoveToNear(Operation):
+    """
+    Words are moved from an entry to a set of near cognates, identified by the number given in the
+    "Cognate set" column.
+    """
+    __title__ = 'Move To Near Cognates'
+    language_id = field('Language ID')
+    word_id = field('Word ID')
+    word_form = field('Word form')
+    entry = entry_field('Original Entry ID')
+    concept = field('Near Cognate concept')
+    cognate_set = field('Cognate set')
+
+    def apply(self, index):
+        form = index.form(self.language_id, self.word_id)
+        index.remove_cognate(form, self.entry)
+        index.add_cfitem(form, index.cfset(
+            'Near-{}-{}'.format(index.batch, self.cognate_set), 'near', self.concept))
+
+
+@attr.s(frozen=True)
+class MoveToChance(Operation):
+    """
+    Words are moved from an entry to a set of chance resemblances (aka "noise"), identified by
+    the gloss.
+    """
+    __title__ = 'Move to Chance'
+    language_id = field('Language ID')
+    word_id = field('Word ID')
+    word_form = field('Word form')
+    entry = entry_field('Original Entry ID')
+    gloss = field('Chance Gloss')
+
+    def apply(self, index):
+        form = index.form(self.language_id, self.word_id)
+        index.remove_cognate(form, self.entry)
+        index.add_cfitem(form, index.cfset(
+            'Noise-{}-{}'.format(index.batch, hashed_id(self.gloss)[:8]), 'noise', self.gloss))
+
+
+@attr.s(frozen=True)
+class AddNote(Operation):
+    __title__ = 'Add New Note To Entry'
+    entry = entry_field('Entry ID')
+    note = field('New Note')
+
+    def destinations(self):
+        return [self.entry]
+
+    def apply(self, index):
+        table, row = index.commentable(self.entry)
+        index.update(table, row, Comment=join(row['Comment'], markdown(self.note), sep='\n\n'))
+
+
+@attr.s(frozen=True)
+class ChangeNote(Operation):
+    __title__ = 'Change Existing Note'
+    entry = entry_field('Entry ID')
+    prepend = field('Append to Beginning of Note')
+    append = field('Append to End of Note')
+    delete = field('Delete from Note')
+
+    def destinations(self):
+        return [self.entry]
+
+    def apply(self, index):
+        table, row = index.commentable(self.entry)
+        comment = row['Comment'] or ''
+        if self.delete:
+            if markdown(self.delete) not in comment:
+                raise Conflict('text to delete not found in note of {}'.format(self.entry.etymon))
+            comment = comment.replace(markdown(self.delete), '')
+        index.update(
+            table, row, Comment=join(markdown(self.prepend), comment, markdown(self.append)))
+
+
+@attr.s(frozen=True)
+class MoveNote(Operation):
+    __title__ = 'Move Existing Note'
+    entry = entry_field('Old entry ID')
+    new_entry = entry_field('New Entry ID')
+    append = field('Append to end')
+
+    def destinations(self):
+        return [self.new_entry]
+
+    def apply(self, index):
+        old_table, old = index.commentable(self.entry)
+        table, new = index.commentable(self.new_entry)
+        if not old['Comment']:
+            raise Conflict('no note for entry {}'.format(self.entry.etymon))
+        index.update(
+            table, new,
+            Comment=join(new['Comment'], join(old['Comment'], markdown(self.append)), sep='\n\n'))
+        index.update(old_table, old, Comment=None)
+
+
+@attr.s(frozen=True)
+class DeleteEntry(Operation):
+    """
+    Deletes an etymon - or a subset, if the entry ID specifies a reconstruction - with its cognate
+    sets, cognates and related cf sets as well as the reconstructions, i.e. forms in
+    proto-languages which are not referenced otherwise.
+    """
+    __title__ = 'Delete Entry'
+    entry = entry_field('Entry ID')
+    form = field('Entry form')
+
+    def apply(self, index):
+        if self.entry.reconstruction:
+            cs, _ = index.reconstruction(self.entry)
+            if cs['Is_Main_Entry']:
+                raise Conflict('cannot delete main reconstruction {} of entry {}'.format(
+                    self.entry.reconstruction, self.entry.etymon))
+            index.cognatesets[cs['Etymon_ID']].remove(cs)
+            sets, etymon = [cs], None
+        else:
+            etymon = index.etymon(self.entry)
+            sets = index.cognatesets.pop(etymon['ID'], [])
+
+        forms, deleted = set(), set()
+        for cs in sets:
+            for cog in index.members.pop(cs['ID'], {}).values():
+                index.unlink('CognateTable', cog)
+                forms.add(cog['Form_ID'])
+                deleted.add(cog['ID'])
+            for cfset in index.cfsets.pop(cs['ID'], []):
+                for item in index.cfitems.pop(cfset['ID'], {}).values():
+                    index.unlink('cfitems.csv', item)
+                    forms.add(item['Form_ID'])
+                index.delete('cf.csv', cfset)
+            index.named_by[cs['Form_ID']].remove(cs)
+            index.delete('CognatesetTable', cs)
+        if etymon:
+            index.delete('etyma.csv', etymon)
+
+        # Update the cognacy of the reflexes and delete orphaned reconstructions:
+        for fid in sorted(forms):
+            form = index.rows['FormTable'][fid]
+            if form['Cognacy']:
+                index.update('FormTable', form, Cognacy=' '.join(
+                    rid for rid in form['Cognacy'].split() if rid not in deleted) or None)
+            if index.rows['LanguageTable'][form['Language_ID']]['Is_Proto'] \
+                    and not index.refs[fid]:
+                index.delete('FormTable', form)
+
+
+@attr.s(frozen=True)
+class MiscChange(Operation):
+    """
+    Free-text instructions, which cannot be applied automatically.
+    """
+    __title__ = 'Misc Entry Change'
+    entry = entry_field('Entry ID')
+    instruction = field('How to Edit')
+
+    def apply(self, index):
+        raise Conflict('manual edit required: {}'.format(self.instruction))
+
+
+# Operation types in the order of application: Data is added before it is changed, moved and
+# deleted.
+OPERATIONS = [
+    AddParentEntry, AddWord, ChangeReconstruction, ChangeWord, MoveWord, MoveToNear, MoveToChance,
+    DeleteWord, AddNote, ChangeNote, MoveNote, DeleteEntry, MiscChange]
+
+
+def normalize_title(s):
+    # Fix typos in file names, like "Reconsructin":
+    return re.sub(r'[^a-z]', '', s.lower()).replace('reconsructin', 'reconstruction')
+
+
+def read_operations(d):
+    """
+    Read the operations from the files in directory `d`.
+
+    :return: `list` of pairs (location, operation) where location is a `str` "<file>:<line>" - in \
+    the order of application.
+    """
+    types = {normalize_title(cls.__title__): cls for cls in OPERATIONS}
+    ops = {cls: [] for cls in OPERATIONS}
+    for p in sorted(pathlib.Path(d).glob('*.txt'), key=lambda p_: p_.name):
+        title = normalize_title(re.sub(r'^ACD-Updates-[0-9]{4}-[0-9]{2}-', '', p.stem))
+        if title not in types:
+            raise ValueError('Unknown operation type: {}'.format(p.name))
+        for i, row in enumerate(reader(p, delimiter='\t', dicts=True), start=2):
+            if any((v or '').strip() for v in row.values()):
+                ops[types[title]].append(('{}:{}'.format(p.name, i), types[title].from_row(row)))
+    return [op for cls in OPERATIONS for op in ops[cls]]
+
+
+def apply(index, operations):
+    """
+    Apply `operations` to `index`, in one pass.
+
+    :return: `list` of triples (location, operation, `Conflict`) for operations which were not \
+    applied.
+    """
+    conflicts = []
+    # Etyma deleted in this batch:
+    deleted = {
+        op.entry.etymon for _, op in operations
+        if isinstance(op, DeleteEntry) and op.entry and not op.entry.reconstruction}
+    for loc, op in operations:
+        try:
+            if op.missing():
+                raise Conflict('no value for {}'.format(', '.join(op.missing())))
+            for entry in op.destinations():
+                if entry and entry.etymon in deleted:
+                    raise Conflict('entry {} is deleted in this batch'.format(entry.etymon))
+            op.apply(index)
+        except Conflict as e:
+            conflicts.append((loc, op, e))
+    return conflicts
+
+
+def batch_name(d):
+    """
+    :return: The date in the name of a directory of updates, like "2023-04" - or the name.
+    """
+    m = re.search('[0-9]{4}-[0-9]{2}', d.name)
+    return m.group(0) if m else d.name
+
+
+def batches(d):
+    """
+    :return: `list` of pairs (batch name, directory) for the batches of updates in directory `d` - \
+    in the order of the names of the directories, i.e. in chronological order.
+    """
+    return [(batch_name(p), p) for p in sorted(pathlib.Path(d).glob(BATCH_DIR)) if p.is_dir()]
+
+
+def apply_batches(cldf, d, log=None):
+    """
+    Apply all batches of updates in directory `d` - in order - to the CLDF data.
+
+    :return: `list` of triples (batch name, number of operations, list of conflicts).
+    """
+    res = []
+    for batch, p in batches(d):
+        operations = read_operations(p)
+        index = Index(cldf, batch)
+        conflicts = apply(index, operations)
+        index.write()
+        if log:
+            for loc, op, e in conflicts:
+                log.warning('{}: {}: {}: {}'.format(batch, loc, op.__title__, e))
+            log.info('{}: {} of {} operations applied'.format(
+                batch, len(operations) - len(conflicts), len(operations)))
+        res.append((batch, len(operations), conflicts))
+    return res
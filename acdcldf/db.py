@@ -0,0 +1,119 @@
+"""
+An SQLite database created from the CLDF data, with indexes for the typical joins across
+etyma, cognate sets, cognates, forms and languages, and with tables materializing the results of
+common aggregate queries.
+
+The schema of the tables created from the CLDF data is the one created by `cldf createdb`, i.e. by
+`pycldf.db.Database`.
+"""
+import pathlib
+import sqlite3
+
+from pycldf.db import Database
+
+__all__ = ['create', 'connect', 'INDEXES', 'MATERIALIZED']
+
+# Covering indexes, as pairs (table name, columns):
+INDEXES = [
+    ('CognatesetTable', ['Etymon_ID', 'cldf_id', 'Is_Main_Entry']),
+    ('CognateTable', ['cldf_cognatesetReference', 'cldf_formReference']),
+    ('CognateTable', ['cldf_formReference', 'cldf_cognatesetReference']),
+    ('FormTable', ['cldf_languageReference', 'cldf_id']),
+    ('etyma.csv', ['cldf_name', 'cldf_id']),
+    ('cf.csv', ['cldf_cognatesetReference', 'cldf_id']),
+    ('cfitems.csv', ['Cfset_ID', 'cldf_formReference']),
+    ('cfitems.csv', ['cldf_formReference', 'Cfset_ID']),
+    ('BorrowingTable', ['cldf_targetFormReference', 'cldf_sourceFormReference']),
+]
+# Materialized views, as triples (table name, SQL query, indexed columns):
+MATERIALIZED = [
+    (
+        'etymon_reflexes',
+        # Number of reflexes of an etymon per language - in the main entry or in subsets:
+        """\
+SELECT
+    cs.Etymon_ID AS etymon_id,
+    f.cldf_languageReference AS language_id,
+    l.Is_Proto AS is_proto,
+    cs.Is_Main_Entry AS is_main_entry,
+    count(c.cldf_id) AS reflexes
+FROM
+    CognateTable AS c
+    JOIN CognatesetTable AS cs ON c.cldf_cognatesetReference = cs.cldf_id
+    JOIN FormTable AS f ON c.cldf_formReference = f.cldf_id
+    JOIN LanguageTable AS l ON f.cldf_languageReference = l.cldf_id
+WHERE cs.Etymon_ID IS NOT NULL
+GROUP BY cs.Etymon_ID, f.cldf_languageReference, l.Is_Proto, cs.Is_Main_Entry""",
+        ['etymon_id', 'is_main_entry', 'is_proto', 'language_id'],
+    ),
+    (
+        'etymon_subsets',
+        """\
+SELECT Etymon_ID AS etymon_id, count(cldf_id) AS subsets
+FROM CognatesetTable WHERE Etymon_ID IS NOT NULL GROUP BY Etymon_ID""",
+        ['etymon_id', 'subsets'],
+    ),
+    (
+        'grapheme_counts',
+        # Number of etyma per initial grapheme of the reconstruction:
+        """SELECT Initial AS initial, count(cldf_id) AS etyma FROM `etyma.csv` GROUP BY Initial""",
+        ['initial', 'etyma'],
+    ),
+]
+
+
+def index_name(table, cols):
+    return 'ix_{}_{}'.format(table.replace('.', '_'), '_'.join(cols)).lower()
+
+
+def create(cldf, path, log=None):
+    """
+    Create the database at `path` - replacing an existing file only when the new one is complete.
+
+    :param cldf: `pycldf.Dataset` instance.
+    """
+    path = pathlib.Path(path)
+    tmp = path.parent / (path.name + '.tmp')
+    if tmp.exists():
+        tmp.unlink()
+    Database(cldf, fname=tmp).write_from_tg(_force=True)
+
+    with sqlite3.connect(str(tmp)) as conn:
+        for table, cols in INDEXES:
+            conn.execute('CREATE INDEX `{}` ON `{}` ({})'.format(
+                index_name(table, cols), table, ', '.join('`{}`'.format(c) for c in cols)))
+        for table, sql, cols in MATERIALIZED:
+            conn.execute('CREATE TABLE `{}` AS {}'.format(table, sql))
+            conn.execute('CREATE INDEX `{}` ON `{}` ({})'.format(
+                index_name(table, cols), table, ', '.join('`{}`'.format(c) for c in cols)))
+            if log:
+                log.info('materialized {}'.format(table))
+        conn.execute('ANALYZE')
+    conn.close()
+    tmp.replace(path)
+    return path
+
+
+def connect(cldf, path, force=False, log=None):
+    """
+    Connect to the database at `path`, creating it if it does not exist.
+
+    :param force: Flag signaling whether to re-create an existing database which lacks the \
+    materialized views - e.g. because it was created with `cldf createdb`.
+    :raises ValueError: If an existing database lacks the materialized views and `force` is not set.
+    """
+    path = pathlib.Path(path)
+    if path.exists():
+        conn = sqlite3.connect(str(path))
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        missing = [table for table, _, _ in MATERIALIZED if table not in tables]
+        if not missing:
+            return conn
+        conn.close()
+        if not force:
+            raise ValueError('{} lacks the materialized views {}, run acd.createdb'.format(
+                path, ', '.join(missing)))
+        if log:
+            log.warning('re-creating {}, lacking the materialized views {}'.format(
+                path, ', '.join(missing)))
+    return sqlite3.connect(str(create(cldf, path, log=log)))
@@ -0,0 +1,20 @@
+"""
+The graphemes of the orthography of reconstructions, used to index etyma by initial.
+"""
+import unicodedata
+
+__all__ = ['GRAPHEMES', 'get_initial']
+
+GRAPHEMES = [
+    'a', 'b', 'c', 'C', 'd', 'e', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'N', 'ñ', 'ŋ', 'o',
+    'p', 'q', 'r', 'R', 's', 'S', 't', 'u', 'w', 'y', 'z']
+
+
+def get_initial(form):
+    # Compute the first grapheme of a reconstruction:
+    first = form.replace('*', '').replace('-', '').replace('(', '').replace('<', '')[0]
+    if first not in GRAPHEMES:
+        # Do away with combining characters!
+        first = unicodedata.normalize('NFD', first)[0]
+    assert first in GRAPHEMES
+    return first
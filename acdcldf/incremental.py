@@ -0,0 +1,279 @@
+"""
+Incremental rebuild of the CLDF data after editorial changes to the curated lists in `etc/`, i.e.
+
+- `etc/glosses.csv` - fixed glosses of forms,
+- `etc/metathesis.tsv` and `etc/assimilation.tsv` - flags of cognates,
+- `etc/brax.tsv` - bracketed forms, which are listed as "also" cf items rather than as cognates.
+
+A full `makecldf` run records - in a dependency manifest written alongside `cldf/` - the rows of
+these files, the information needed to recompute the rows they affect and checksums of all other
+inputs. `rebuild` then compares the current rows of the files with the manifest, recomputes only
+the forms, cognate sets, cognates and cf sets affected by changed rows and splices them into the
+existing CSV files.
+
+Changes to any other input - e.g. `raw/v1.2`, `etc/languages.tsv` or the batches of content
+updates in `raw/`, which are applied by `makecldf` - still require a full run.
+Rows added to a table by `rebuild` are appended, so the row order may differ from the one of a
+full run.
+"""
+import json
+import pathlib
+import hashlib
+
+from acdcldf.markdown import MarkdownLinker
+from acdcldf.contentupdates import Index, Conflict, batches
+
+__all__ = ['Manifest', 'read_tracked', 'checksums', 'rebuild', 'MANIFEST']
+
+MANIFEST = 'cldf-manifest.json'
+# Inputs of `makecldf` for which no incremental rebuild is possible, relative to the dataset dir:
+UNTRACKED = [
+    'lexibank_acd.py',
+    'acdcldf/tree.py',
+    'acdcldf/graphemes.py',
+    'acdcldf/markdown.py',
+    'acdcldf/contentupdates.py',
+    'raw/v1.2',
+    'etc/languages.tsv',
+    'etc/sources.bib',
+    'etc/dempwolff_etymologies.csv',
+    'etc/doublets_and_disjuncts.csv',
+]
+
+
+def read_tracked(etc_dir):
+    """
+    :return: `dict` mapping names of the tracked files to `dict`s mapping row keys to values.
+    """
+    return {
+        'glosses.csv': {
+            r['Form_ID_v1.2']: [r['Gloss_Fixed'], r['Source']]
+            for r in etc_dir.read_csv('glosses.csv', dicts=True)},
+        'metathesis.tsv': {
+            r['CID']: True for r in etc_dir.read_csv('metathesis.tsv', dicts=True, delimiter='\t')},
+        'assimilation.tsv': {
+            r['CID']: True
+            for r in etc_dir.read_csv('assimilation.tsv', dicts=True, delimiter='\t')},
+        'brax.tsv': {
+            '\t'.join(r): True
+            for i, r in enumerate(etc_dir.read_csv('brax.tsv', delimiter='\t')) if i and r},
+    }
+
+
+def checksums(d):
+    res = {}
+    for name in UNTRACKED + [p.relative_to(d).as_posix() for _, p in batches(d / 'raw')]:
+        p = d / name
+        for pp in sorted(p.rglob('*')) if p.is_dir() else [p]:
+            if pp.is_file():
+                res[pp.relative_to(d).as_posix()] = hashlib.md5(pp.read_bytes()).hexdigest()
+    return res
+
+
+class Manifest:
+    """
+    The dependency manifest of the CLDF data:
+
+    - `rows`: The rows of the tracked files, as returned by `read_tracked`.
+    - `forms`: Maps v1.2 form IDs in `etc/glosses.csv` to pairs (form ID, original sources).
+    - `renamed`: Maps v1.2 form IDs to form IDs, where they differ.
+    - `brax`: Maps keys of `etc/brax.tsv` to the cognate replaced by an "also" cf item.
+    - `inputs`: Checksums of the untracked inputs.
+    """
+    def __init__(self, rows=None, forms=None, renamed=None, brax=None, inputs=None):
+        self.rows = rows or {}
+        self.forms = forms or {}
+        self.renamed = renamed or {}
+        self.brax = brax or {}
+        self.inputs = inputs or {}
+        # The inverse of `renamed`, keeping the first v1.2 form ID renamed to a form ID:
+        self._old_ids = {}
+        for old, new in self.renamed.items():
+            self._old_ids.setdefault(new, old)
+
+    @classmethod
+    def from_file(cls, p):
+        return cls(**json.loads(pathlib.Path(p).read_text(encoding='utf8')))
+
+    def write(self, p):
+        p = pathlib.Path(p)
+        tmp = p.parent / (p.name + '.tmp')
+        with tmp.open('w', encoding='utf8') as fp:
+            json.dump(dict(
+                rows=self.rows,
+                forms=self.forms,
+                renamed=self.renamed,
+                brax=self.brax,
+                inputs=self.inputs,
+            ), fp, ensure_ascii=False, indent=1, sort_keys=True)
+        tmp.replace(p)
+
+    def add_form(self, fid, form, source, glossed):
+        """
+        Record the mapping of v1.2 form ID `fid` to the form added to the CLDF data.
+
+        :param source: The sources of the v1.2 form - before the fix from `etc/glosses.csv`.
+        """
+        if glossed:
+            self.forms[fid] = [form['ID'], list(source or [])]
+        if form['ID'] != fid:
+            self.renamed[fid] = form['ID']
+            self._old_ids.setdefault(form['ID'], fid)
+
+    def add_brax(self, key, cid, fid, csid, rid):
+        self.brax['\t'.join(key)] = dict(
+            ID=cid, Form_ID=fid, Cognateset_ID=csid, Reconstruction_ID=rid)
+
+    def old_id(self, fid):
+        return self._old_ids.get(fid, fid)
+
+
+def changed(old, new):
+    """
+    :return: `list` of pairs (key, value) for keys added, removed (with value `None`) or changed.
+    """
+    return [(k, new.get(k)) for k in sorted(set(old) | set(new)) if old.get(k) != new.get(k)]
+
+
+def rebuild(ds, log=None):
+    """
+    Rebuild the rows of the CLDF data affected by changes to the tracked files.
+
+    :param ds: The `lexibank_acd.Dataset`.
+    :return: `list` of names of the tables written - empty, if nothing changed.
+    :raises ValueError: If a full run of `makecldf` is required.
+    """
+    p = ds.dir / MANIFEST
+    if not p.exists():
+        raise ValueError('No manifest {}, run makecldf first'.format(p))
+    manifest = Manifest.from_file(p)
+    inputs = checksums(ds.dir)
+    for name in sorted(set(inputs) | set(manifest.inputs)):
+        if inputs.get(name) != manifest.inputs.get(name):
+            raise ValueError('{} changed, run makecldf'.format(name))
+
+    rows = read_tracked(ds.etc_dir)
+    changes = {
+        fname: changed(manifest.rows.get(fname, {}), rows[fname]) for fname in rows}
+    if not any(changes.values()):
+        return []
+
+    index = Index(ds.cldf_reader(), None)
+    rebuilder = Rebuilder(index, manifest, rows, MarkdownLinker(ds.languages))
+    try:
+        # Bracketed forms first, so that cognates restored from "also" cf sets get their flags:
+        for fname, method in [
+            ('brax.tsv', rebuilder.brax),
+            ('metathesis.tsv', rebuilder.metathesis),
+            ('assimilation.tsv', rebuilder.assimilation),
+            ('glosses.csv', rebuilder.gloss),
+        ]:
+            for key, value in changes[fname]:
+                method(key, value)
+            if log and changes[fname]:
+                log.info('{}: {} changed rows'.format(fname, len(changes[fname])))
+    except Conflict as e:
+        raise ValueError('{}, run makecldf'.format(e))
+
+    res = index.write()
+    manifest.rows = rows
+    manifest.write(p)
+    return res
+
+
+class Rebuilder:
+    """
+    Recomputes the rows affected by one changed row of a tracked file - mirroring what
+    `Dataset.cmd_makecldf` does.
+    """
+    def __init__(self, index, manifest, rows, linker):
+        self.index = index
+        self.manifest = manifest
+        self.rows = rows
+        self.linker = linker
+
+    def gloss(self, fid, value):
+        index = self.index
+        new_id, source = self.manifest.forms.get(fid) or [self.manifest.renamed.get(fid, fid), None]
+        form = index.get('FormTable', new_id, 'form')
+        if source is None:  # The form had no fixed gloss, so its sources are the original ones.
+            source = form['Source']
+        if fid in self.manifest.forms and not value:
+            del self.manifest.forms[fid]
+        description = index.rows['ParameterTable'][form['Parameter_ID']]['Name']
+        if value:
+            self.manifest.forms[fid] = [new_id, list(source or [])]
+            description, fixed_source = value
+            if fixed_source:
+                source = fixed_source.split()
+        if not description:
+            raise Conflict('empty gloss for {}'.format(fid))
+        index.update('FormTable', form, Description=self.linker(description), Source=source)
+        # The names of cognate sets include the meaning of the main reconstruction:
+        index.name_cognatesets(form)
+
+    def _flag(self, col, cid, value):
+        self.index.update('CognateTable', self.index.get('CognateTable', cid), **{col: bool(value)})
+
+    def metathesis(self, cid, value):
+        self._flag('Metathesis', cid, value)
+
+    def assimilation(self, cid, value):
+        self._flag('Assimilation', cid, value)
+
+    def brax(self, key, value):
+        index = self.index
+        if not value:  # Restore the cognate.
+            cog = self.manifest.brax.pop(key)
+            cfid = cog['Cognateset_ID'] + '-also'
+            item = index.cfitems[cfid].pop(cog['Form_ID'])
+            index.unlink('cfitems.csv', item)
+            if not index.cfitems[cfid]:
+                cfset = index.rows['cf.csv'][cfid]
+                index.cfsets[cog['Cognateset_ID']].remove(cfset)
+                index.delete('cf.csv', cfset)
+            form = index.get('FormTable', cog['Form_ID'])
+            cs = index.get('CognatesetTable', cog['Cognateset_ID'])
+            index.link(form, cs, cog['ID'])
+            index.update(
+                'CognateTable',
+                index.rows['CognateTable'][cog['ID']],
+                Metathesis=cog['ID'] in self.rows['metathesis.tsv'],
+                Assimilation=cog['ID'] in self.rows['assimilation.tsv'])
+            index.set_cognacy(form, add=cog['Reconstruction_ID'])
+            return
+
+        eid, lname, wform = key.split('\t')
+        for cs in index.cognatesets.get(eid, []):
+            for fid, cog in index.members[cs['ID']].items():
+                form = index.rows['FormTable'][fid]
+                lang = index.rows['LanguageTable'][form['Language_ID']]
+                if form['Value'] == wform and lang['Name'].replace(' ', '_') == lname:
+                    break
+            else:
+                continue
+            break
+        else:
+            raise Conflict('brax item {} not matched'.format(key.split('\t')))
+
+        # The reconstruction the form is a reflex of:
+        rids = set((form['Cognacy'] or '').split()) & set(
+            c['ID'] for c in index.members[cs['ID']].values())
+        if len(rids) != 1:
+            raise Conflict('no unique reconstruction for brax item {}'.format(key.split('\t')))
+        rid = rids.pop()
+        if cog['ID'] in self.rows['metathesis.tsv'] or cog['ID'] in self.rows['assimilation.tsv']:
+            raise Conflict('brax item {} is flagged'.format(key.split('\t')))
+
+        del index.members[cs['ID']][fid]
+        index.unlink('CognateTable', cog)
+        index.set_cognacy(form, remove=rid)
+        cfid = cs['ID'] + '-also'
+        if cfid not in index.rows['cf.csv']:
+            index.cfsets[cs['ID']].append(index.add(
+                'cf.csv', dict(ID=cfid, Name='Also', Category='also', Cognateset_ID=cs['ID'])))
+        index.cfitems[cfid][fid] = index.add('cfitems.csv', dict(
+            ID='{}-{}'.format(cfid, self.manifest.old_id(fid)), Cfset_ID=cfid, Form_ID=fid))
+        index.refs[fid] += 1
+        self.manifest.brax[key] = dict(
+            ID=cog['ID'], Form_ID=fid, Cognateset_ID=cs['ID'], Reconstruction_ID=rid)
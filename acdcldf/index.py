@@ -0,0 +1,185 @@
+"""
+A persistent index of the etyma in the CLDF data, providing fast lookup of all data needed to
+display an etymon.
+
+The index is stored in an SQLite database, with the data for each etymon - subsets, cognates with
+forms and languages, cf sets with items - pickled into one blob. It is rebuilt automatically
+when any file in the CLDF directory changes.
+"""
+import pickle
+import pathlib
+import sqlite3
+import functools
+import collections
+
+import newick
+from pycldf.trees import TreeTable
+
+from acdcldf.tree import ProtoLanguageTree
+
+__all__ = ['EtymonIndex']
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value BLOB);
+CREATE TABLE etyma (id TEXT PRIMARY KEY, pos INTEGER, data BLOB);
+CREATE TABLE names (name TEXT, pos INTEGER);
+CREATE INDEX names_name ON names(name);
+"""
+
+
+def signature(d):
+    """
+    :return: A `str` representing the state of the files in directory `d`.
+    """
+    return repr(sorted(
+        (p.name, p.stat().st_size, p.stat().st_mtime_ns) for p in d.iterdir() if p.is_file()))
+
+
+def normalize_name(s):
+    return s.replace('*', '')
+
+
+class EtymonIndex:
+    """
+    Usage:
+
+    >>> index = EtymonIndex.from_dataset(Dataset())
+    >>> etymon = index['qeCeŋ']
+    """
+    def __init__(self, path):
+        self.path = pathlib.Path(path)
+        self._conn = None
+
+    @classmethod
+    def from_dataset(cls, ds, path=None, rebuild=False):
+        """
+        :param ds: `lexibank_acd.Dataset` instance.
+        :param path: Path of the index database - defaults to `.cache/etymon-index.sqlite` in the \
+        repository.
+        """
+        index = cls(path or ds.dir / '.cache' / 'etymon-index.sqlite')
+        if rebuild or index.meta('signature') != signature(ds.cldf_dir):
+            index.build(ds.cldf_reader(), signature(ds.cldf_dir))
+        return index
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(str(self.path))
+        return self._conn
+
+    def in_memory(self):
+        """
+        Copy the index database into memory, e.g. for a long-running server.
+        """
+        mem = sqlite3.connect(':memory:')
+        self.conn.backup(mem)
+        self._conn.close()
+        self._conn = mem
+        return self
+
+    def meta(self, key):
+        if self._conn is None and not self.path.exists():
+            return None
+        try:
+            res = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        except sqlite3.DatabaseError:  # Not a valid index; will be rebuilt.
+            return None
+        return pickle.loads(res[0]) if res else None
+
+    @property
+    def tree(self):
+        """The Newick tree of reconstruction levels, with language IDs as node names."""
+        return self.meta('tree')
+
+    @property
+    def rlevels(self):
+        """Abbreviations of the reconstruction levels, ordered top-down."""
+        return self.meta('rlevels')
+
+    @functools.cached_property
+    def proto_tree(self):
+        """The tree of reconstruction levels as `ProtoLanguageTree`, with abbreviations as names."""
+        tree = newick.loads(self.tree)[0]
+        return ProtoLanguageTree(
+            tree, rename=dict(zip([n.name for n in tree.walk()], self.rlevels)))
+
+    def build(self, cldf, sig=None):
+        """
+        Build the index from a `pycldf.Dataset`, reading each table once.
+        """
+        tree = None
+        for tree in TreeTable(cldf):
+            tree = tree.newick()
+            break
+
+        langs = {row['ID']: row for row in cldf['LanguageTable']}
+        forms = {row['ID']: row for row in cldf['FormTable']}
+        subsets, cognates = collections.defaultdict(list), collections.defaultdict(list)
+        cfsets, cfitems = collections.defaultdict(list), collections.defaultdict(list)
+        for row in cldf['CognatesetTable']:
+            subsets[row['Etymon_ID']].append(row)
+        for row in cldf['CognateTable']:
+            cognates[row['Cognateset_ID']].append(row)
+        for row in cldf['cf.csv']:
+            if row['Cognateset_ID']:
+                cfsets[row['Cognateset_ID']].append(row)
+        for row in cldf['cfitems.csv']:
+            cfitems[row['Cfset_ID']].append(row)
+
+        def item(row):
+            form = forms[row['Form_ID']]
+            return row, form, langs[form['Language_ID']]
+
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+        self.__dict__.pop('proto_tree', None)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.parent / (self.path.name + '.tmp')
+        if tmp.exists():
+            tmp.unlink()
+        with sqlite3.connect(str(tmp)) as conn:
+            conn.executescript(SCHEMA)
+            for pos, ety in enumerate(cldf['etyma.csv']):
+                data = dict(
+                    etymon=ety,
+                    subsets=[
+                        dict(
+                            cognateset=cs,
+                            cognates=[item(cog) for cog in cognates[cs['ID']]],
+                            cfsets=[
+                                (cf, [item(i) for i in cfitems[cf['ID']]])
+                                for cf in cfsets[cs['ID']]],
+                        ) for cs in subsets[ety['ID']]],
+                )
+                conn.execute(
+                    'INSERT INTO etyma VALUES (?, ?, ?)',
+                    (ety['ID'], pos, pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)))
+                conn.execute(
+                    'INSERT INTO names VALUES (?, ?)', (normalize_name(ety['Name']), pos))
+            conn.executemany('INSERT INTO meta VALUES (?, ?)', [
+                (k, pickle.dumps(v)) for k, v in [
+                    ('tree', tree.newick if tree else None),
+                    ('rlevels', [langs[n.name]['Abbr'] for n in tree.walk()] if tree else []),
+                    ('signature', sig),
+                ]])
+        conn.close()
+        tmp.replace(self.path)
+        return self
+
+    def __getitem__(self, etymon):
+        """
+        :param etymon: Name (with or without asterisks) or ID of an etymon.
+        :return: `dict` with the etymon data.
+        """
+        # If both match, the first etymon in etyma.csv matching by name or ID wins.
+        res = self.conn.execute(
+            """\
+SELECT data FROM etyma WHERE pos = (
+    SELECT min(pos) FROM (
+        SELECT pos FROM names WHERE name = ? UNION SELECT pos FROM etyma WHERE id = ?))""",
+            (normalize_name(etymon), etymon)).fetchone()
+        if not res:
+            raise KeyError(etymon)
+        return pickle.loads(res[0])
@@ -0,0 +1,247 @@
+"""
+Validation of the links in CLDF Markdown columns.
+
+Rather than rendering each text with `pycldf.ext.markdown.CLDFMarkdownText` - which reads the
+sources anew for each instance and resolves links via `get_object` - we extract links with
+`CLDFMarkdownLink.pattern` and look up the referenced IDs in an index, built once per referenced
+table.
+
+Validation can be incremental: For each row, a hash of the text, the number of links, the
+referenced tables and the missing links are stored in a state file. Rows are only checked again
+if the text changed, or if the IDs in one of the referenced tables changed.
+"""
+import json
+import hashlib
+import pathlib
+import collections
+import multiprocessing
+
+from pycldf.ext.markdown import CLDFMarkdownLink
+
+__all__ = ['LinkIndex', 'LinkValidator', 'ColumnResult', 'markdown_columns']
+
+SOURCE_COMPONENT = 'Source'
+METADATA_COMPONENT = 'Metadata'
+
+ColumnResult = collections.namedtuple('ColumnResult', 'table column rows checked links missing')
+
+
+def markdown_columns(cldf):
+    """
+    :return: `list` of pairs (table name, column name) for all columns with CLDF Markdown.
+    """
+    cols = []
+    for t in cldf.tables:
+        try:
+            tname = cldf.get_tabletype(t)
+        except ValueError:
+            tname = None
+        tname = tname or str(t.url)
+        for col in t.tableSchema.columns:
+            if col.common_props.get('dc:conformsTo') == 'CLDF Markdown':
+                cols.append((tname, col.name))
+    return cols
+
+
+def text_hash(s):
+    return hashlib.md5(s.encode('utf8')).hexdigest()
+
+
+class LinkIndex:
+    """
+    The IDs of the objects which may be referenced in CLDF Markdown links, indexed by table.
+
+    The index is filled lazily from a `pycldf.Dataset`. After `LinkIndex.load` has been called
+    for all texts to be checked, the index can be used - e.g. pickled and sent to other
+    processes - without the dataset.
+    """
+    def __init__(self, cldf=None):
+        self.cldf = cldf
+        # Map last path components of link URLs to table keys:
+        self.keys = {}
+        # Map table keys to `set`s of IDs, or `None` for tables which are not in the dataset:
+        self.ids = {}
+
+    def __getstate__(self):
+        return dict(cldf=None, keys=self.keys, ids=self.ids)
+
+    @staticmethod
+    def links(text):
+        for m in CLDFMarkdownLink.pattern.finditer(text):
+            if m.group('url') is not None:
+                link = CLDFMarkdownLink.from_match(m)
+                if link.is_cldf_link:
+                    yield link
+
+    def key(self, name):
+        if name not in self.keys:
+            comp = None
+            if self.cldf is not None:
+                if name in (self.cldf.bibname, SOURCE_COMPONENT):
+                    comp = SOURCE_COMPONENT
+                elif name in (self.cldf.filename, METADATA_COMPONENT):
+                    comp = METADATA_COMPONENT
+                else:
+                    try:
+                        comp = self.cldf.get_tabletype(self.cldf[name])
+                    except (KeyError, ValueError):
+                        pass
+            self.keys[name] = comp or name
+            key = self.keys[name]
+            if key not in self.ids:
+                self.ids[key] = self._read_ids(key)
+        return self.keys[name]
+
+    def _read_ids(self, key):
+        if self.cldf is None or key == METADATA_COMPONENT:
+            return None
+        if key == SOURCE_COMPONENT:
+            return {src.id for src in self.cldf.sources}
+        try:
+            return {row['id'] for row in self.cldf.iter_rows(key, 'id')}
+        except KeyError:
+            return None
+
+    def load(self, texts):
+        """
+        Make sure the tables referenced in `texts` are indexed.
+        """
+        for text in texts:
+            if text and '[' in text:
+                for link in self.links(text):
+                    self.key(link.table_or_fname)
+        return self
+
+    def digest(self, key):
+        ids = self.ids.get(key)
+        return text_hash('\n'.join(sorted(ids))) if ids is not None else None
+
+    def check(self, text):
+        """
+        :return: triple (number of links, `list` of missing links, `set` of referenced table keys)
+        """
+        n, missing, keys = 0, [], set()
+        for link in self.links(text):
+            n += 1
+            key = self.key(link.table_or_fname)
+            keys.add(key)
+            if link.prefix:  # We only know about the dataset itself.
+                found = False
+            elif key == METADATA_COMPONENT:
+                found = True
+            else:
+                found = self.ids.get(key) is not None and (link.all or link.objid in self.ids[key])
+            if not found:
+                missing.append('{}:{}:{}'.format(link.label, link.table_or_fname, link.objid))
+        return n, missing, keys
+
+
+class LinkValidator:
+    """
+    Usage:
+
+    >>> validator = LinkValidator(cldf, state='.cache/check-markdown.json')
+    >>> for table, column in markdown_columns(cldf):
+    ...     res = validator.validate(table, column)
+    >>> validator.save()
+    """
+    def __init__(self, cldf, state=None, workers=None):
+        """
+        :param state: Path of a JSON file to persist the validation state in. If `None`, all \
+        rows are checked.
+        :param workers: If a number > 1 is passed, rows are checked in a pool of as many \
+        processes.
+        """
+        self.cldf = cldf
+        self.workers = workers
+        self.index = LinkIndex(cldf)
+        self.state_path = pathlib.Path(state) if state else None
+        self.state = dict(digests={}, columns={})
+        if self.state_path and self.state_path.exists():
+            try:
+                self.state = json.loads(self.state_path.read_text(encoding='utf8'))
+            except ValueError:  # Not a valid state file; will be overwritten.
+                pass
+        self.digests = {}
+
+    def digest(self, key):
+        if key not in self.digests:
+            self.index.key(key)
+            self.digests[key] = self.index.digest(key)
+        return self.digests[key]
+
+    def changed(self, keys):
+        """
+        :return: Flag signaling whether the IDs in any of the tables `keys` changed since the \
+        state was saved.
+        """
+        return any(self.digest(key) != self.state['digests'].get(key) for key in keys)
+
+    def rows(self, table, column):
+        """
+        :return: `list` of pairs (row ID, text) for rows with non-empty text in `column`.
+        """
+        return [
+            (row.get('ID', str(i)), row[column])
+            for i, row in enumerate(self.cldf[table], start=1) if row[column]]
+
+    def validate(self, table, column):
+        """
+        :return: `ColumnResult` with missing links as `Counter`.
+        """
+        rows = self.rows(table, column)
+        old = self.state['columns'].get('{}:{}'.format(table, column), {})
+        new, todo = {}, []
+        for rid, text in rows:
+            h = text_hash(text)
+            if rid in old and old[rid][0] == h and not self.changed(old[rid][2]):
+                new[rid] = old[rid]
+            else:
+                todo.append((rid, h, text))
+
+        for (rid, h, _), (n, missing, keys) in zip(todo, self.check([t for _, _, t in todo])):
+            new[rid] = [h, n, sorted(keys), missing]
+
+        self.state['columns']['{}:{}'.format(table, column)] = new
+        missing = collections.Counter()
+        for rid, _ in rows:
+            missing.update(new[rid][3])
+        return ColumnResult(
+            table, column, len(rows), len(todo), sum(new[rid][1] for rid, _ in rows), missing)
+
+    def check(self, texts):
+        """
+        :return: `list` of results of `LinkIndex.check` for `texts` - in the order of `texts`.
+        """
+        if self.workers and self.workers > 1 and len(texts) > self.workers:
+            # Workers only get the (pickled) index of the tables referenced in the texts, not the
+            # dataset:
+            self.index.load(texts)
+            size = -(-len(texts) // (self.workers * 4))
+            chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+            with multiprocessing.Pool(
+                    min(self.workers, len(chunks)),
+                    initializer=_init,
+                    initargs=(self.index,)) as pool:
+                return [res for chunk in pool.imap(_check, chunks) for res in chunk]
+        return [self.index.check(text) for text in texts]
+
+    def save(self):
+        if self.state_path:
+            keys = {k for col in self.state['columns'].values() for r in col.values() for k in r[2]}
+            self.state['digests'] = {k: self.digest(k) for k in sorted(keys)}
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.state_path.open('w', encoding='utf8') as fp:
+                json.dump(self.state, fp)
+
+
+_INDEX = None
+
+
+def _init(index):
+    global _INDEX
+    _INDEX = index
+
+
+def _check(texts):
+    return [_INDEX.check(text) for text in texts]
@@ -0,0 +1,115 @@
+"""
+Linking of languages and root sets in the descriptions and comments of the CLDF data.
+"""
+import re
+import functools
+
+from clldutils.markup import MarkdownLink
+from pycldf.ext.markdown import CLDFMarkdownLink
+
+__all__ = ['MarkdownLinker']
+
+
+class MarkdownLinker:
+    """
+    Turns the `__language__<name>__` markup in descriptions and comments into CLDF Markdown links,
+    fixes CLDF Markdown links to languages and - optionally - links to root sets.
+
+    Since the same descriptions are used for many forms, results are memoized.
+    """
+    language_pattern = re.compile('__language__(.*?)__', re.DOTALL)
+    # Names of languages which are not in the ACD:
+    unlinked = {
+        'Arabic',
+        'Portuguese', 'Dutch',
+        'Spanish',
+        'Sanskrit',  # https://glottolog.org/resource/languoid/id/sans1269
+        'Philippine',
+        'Tamil',  # https://glottolog.org/resource/languoid/id/tami1289
+        'Hindi',
+        'Persian',
+    }
+
+    def __init__(self, languages, roots=None):
+        """
+        :param languages: `list` of `dict`s with language metadata.
+        :param roots: `dict` mapping root forms to cf set IDs, as returned by `root2id`.
+        """
+        self.abbrs, self.names = {}, {}
+        for lang in languages:
+            if lang['Abbr']:
+                self.abbrs[lang['Abbr']] = lang['ID']
+                self.abbrs[lang['Abbr'].lower()] = lang['ID']
+            self.names[lang['Name']] = lang['ID']
+        self.names["Sa’a"] = self.names["Sa'a"]
+        self.names["Iloko"] = self.names["Ilokano"]
+        self.lmap = dict(self.abbrs)
+        self.lmap.update(self.names)
+        self.roots = roots or {}
+        self.link = functools.lru_cache(maxsize=2 ** 16)(self.link)
+
+    def __call__(self, text, with_roots=False):
+        if not text:
+            return text
+        return self.link(text, with_roots)
+
+    def link_language(self, m):
+        lname = m.group(1)
+        if lname in self.unlinked:
+            return lname
+        if lname.lower() == 'gcph':
+            return '[Greater Central Philippine](https://glottolog.org/resource/languoid/id/grea1284)'
+        lid = self.lmap.get(lname)
+        if not lid:
+            lid = self.lmap.get(lname.lower())
+            if not lid:
+                lid = self.lmap.get('p' + lname.lower())
+        if lid:
+            return '[{}](LanguageTable#cldf:{})'.format(lname, lid)
+        return lname
+
+    def fix_language_link(self, ml):
+        if ml.table_or_fname == 'LanguageTable':
+            oid = ml.objid
+            if ml.objid in self.abbrs:
+                oid = self.abbrs[ml.objid]
+            elif ml.objid.upper() in self.abbrs:
+                oid = self.abbrs[ml.objid.upper()]
+            elif 'P' + ml.objid in self.abbrs:
+                oid = self.abbrs['P' + ml.objid]
+            elif not oid and (ml.label in self.names):
+                oid = self.names[ml.label]
+            if oid != ml.objid:
+                ml.url = 'LanguageTable#cldf:' + oid
+            if not oid:
+                return ml.label
+        return ml
+
+    def link_root(self, ml):
+        if ml.url.startswith('root-acd'):
+            key = ml.label.strip().replace('&ast;', '')
+            if key in self.roots:
+                ml.url = 'cf.csv#cldf:{}'.format(self.roots[key])
+                removal_marker = '__remove__' if '(' in ml.url else ''
+                if removal_marker:
+                    assert ')' not in ml.url
+                    return '{}{}'.format(ml, removal_marker)
+                return ml
+            return ml.label
+        return ml
+
+    def link(self, text, with_roots):
+        res = text
+        if '__language__' in res:
+            res = self.language_pattern.sub(self.link_language, res)
+            assert '__language__' not in res, text
+        res = res.strip().replace('\n\n\n', '\n')
+        # Only texts containing links must be run through the (comparatively slow) link detection:
+        if '](' in res:
+            if 'LanguageTable' in res:
+                res = CLDFMarkdownLink.replace(res, self.fix_language_link)
+            if with_roots and self.roots and 'root-acd' in res:
+                res = MarkdownLink.replace(res, self.link_root)
+        res = res.replace('__remove__)', '')
+        assert '__remove__' not in res, res
+        return res
@@ -0,0 +1,55 @@
+"""
+Spooling of the rows of large tables to disk while the CLDF data is created.
+
+`cldfbench`'s `CLDFWriter` collects the rows of all tables in lists in `CLDFWriter.objects` and
+writes them when the writer context is left. Replacing the lists of the large tables - forms,
+cognates, cf items and borrowings - with `RowSpool`s, rows are pickled to a temporary file as they
+are added and streamed from there when the CSV files are written, so that memory use does not grow
+with the number of rows.
+"""
+import pickle
+import tempfile
+
+__all__ = ['RowSpool']
+
+
+class RowSpool:
+    """
+    A list-like container of rows, supporting `append`, `len` and iteration.
+
+    Rows are pickled when appended, so changes to a row after appending it are lost. Values which
+    are only known after all rows have been added must be filled in by the `annotate` function,
+    which is called for each row when iterating.
+    """
+    def __init__(self, annotate=None):
+        """
+        :param annotate: Callable accepting a row `dict` and returning the row to be written.
+        """
+        self.annotate = annotate
+        self._fp = tempfile.TemporaryFile()
+        self._len = 0
+
+    def append(self, row):
+        self._fp.seek(0, 2)
+        pickle.dump(row, self._fp, protocol=pickle.HIGHEST_PROTOCOL)
+        self._len += 1
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        self._fp.flush()
+        pos, n = 0, self._len
+        for _ in range(n):
+            # Rows may be appended while iterating, so we keep track of our position in the file:
+            self._fp.seek(pos)
+            row = pickle.load(self._fp)
+            pos = self._fp.tell()
+            yield self.annotate(row) if self.annotate else row
+
+    def close(self):
+        self._fp.close()
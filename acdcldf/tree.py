@@ -0,0 +1,118 @@
+"""
+The tree of proto-languages, i.e. of reconstruction levels, with precomputed lookup tables.
+"""
+import newick
+
+__all__ = ['ProtoLanguageTree', 'TREE', 'PROTO_TREE']
+
+
+class ProtoLanguageTree:
+    """
+    A tree of proto-languages, parsed once, providing constant time lookup of
+
+    - the rank of a node in pre-order, i.e. the order in which reconstruction levels are listed,
+    - the depth of a node,
+    - the chain of ancestors of a node,
+    - bitmasks of descendants and ancestors, where node i in pre-order is represented by bit i.
+
+    Usage:
+
+    >>> tree = ProtoLanguageTree('(Form.,((PPH)PWMP,(PCMP,(PSHWNG,POC)PEMP)PCEMP)PMP)PAN;')
+    >>> tree.nearest_ancestor('PPH', {'PMP', 'PAN'})
+    'PMP'
+    """
+    def __init__(self, tree, rename=None):
+        """
+        :param tree: Newick `str` or `newick.Node`.
+        :param rename: `dict` mapping node names to names to be used instead.
+        """
+        if isinstance(tree, str):
+            tree = newick.loads(tree)[0]
+        rename = rename or {}
+        self.newick = tree.newick
+        self.names, self._rank, self._depth, self._ancestors = [], {}, {}, {}
+        self._descendants = {}
+
+        def visit(node, path):
+            name = rename.get(node.name, node.name)
+            if name not in self._rank:
+                self._rank[name] = len(self.names)
+            self.names.append(name)
+            self._depth.setdefault(name, len(path))
+            path = (name,) + path
+            self._ancestors.setdefault(name, path)
+            for child in node.descendants:
+                visit(child, path)
+
+        visit(tree, ())
+        self.bits = {name: 1 << rank for name, rank in self._rank.items()}
+        self._ancestors_mask = {
+            name: self.mask(path) for name, path in self._ancestors.items()}
+        for name, path in self._ancestors.items():
+            for n in path:
+                self._descendants[n] = self._descendants.get(n, 0) | self.bits[name]
+
+    def __contains__(self, name):
+        return name in self._rank
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def root(self):
+        return self.names[0]
+
+    def rank(self, name):
+        """
+        :return: Position of the (first) node called `name` in pre-order.
+        """
+        return self._rank[name]
+
+    def depth(self, name):
+        return self._depth[name]
+
+    def ancestors(self, name, inclusive=True):
+        """
+        :return: `tuple` of names on the path from the node up to the root.
+        """
+        path = self._ancestors[name]
+        return path if inclusive else path[1:]
+
+    def nearest_ancestor(self, name, names):
+        """
+        :return: The first node on the path from node `name` up to the root, which is in `names` \
+        or `None` - also if `name` is not in the tree.
+        """
+        for n in self._ancestors.get(name, ()):
+            if n in names:
+                return n
+
+    def mask(self, names):
+        """
+        :return: Bitmask for the nodes in `names` - ignoring names which are not in the tree.
+        """
+        res = 0
+        for name in names:
+            res |= self.bits.get(name, 0)
+        return res
+
+    def nodes(self, mask):
+        """
+        :return: `list` of names of the nodes in `mask`, in pre-order.
+        """
+        return [name for name, bit in self.bits.items() if mask & bit]
+
+    def descendants_mask(self, name, inclusive=True):
+        return self._descendants[name] if inclusive else self._descendants[name] & ~self.bits[name]
+
+    def ancestors_mask(self, name, inclusive=True):
+        return self._ancestors_mask[name] if inclusive \
+            else self._ancestors_mask[name] & ~self.bits[name]
+
+
+# The reconstruction levels of the ACD:
+TREE = newick.loads('(Form.,((PPH)PWMP,(PCMP,(PSHWNG,POC)PEMP)PCEMP)PMP)PAN;')[0]
+PROTO_TREE = ProtoLanguageTree(TREE)
@@ -0,0 +1,53 @@
+"""
+Apply a new batch of tabular content updates to the CLDF data, reporting operations which could not
+be applied.
+
+Batches in raw/ - e.g. raw/2023-04 Content Updates/ - are applied by makecldf. Updates applied from
+other directories are lost with the next makecldf run, unless the batch is moved to raw/.
+"""
+from clldutils.clilib import PathType
+
+from acdcldf import contentupdates
+
+from lexibank_acd import Dataset
+
+
+def register(parser):
+    parser.add_argument(
+        '--updates-dir',
+        help="Directory containing the update files as '*.txt'.",
+        type=PathType(type='dir'),
+        required=True)
+    parser.add_argument(
+        '--batch',
+        help='Name of the batch of updates, used for IDs of new cf sets (defaults to the '
+             'date in the name of the updates directory).',
+        default=None)
+    parser.add_argument(
+        '--dry-run',
+        help='Only report conflicts, without writing the CLDF data.',
+        action='store_true',
+        default=False)
+
+
+def run(args):
+    ds = Dataset()
+    d = args.updates_dir
+    if d.resolve() in [p.resolve() for _, p in contentupdates.batches(ds.raw_dir)]:
+        args.log.error('{} is applied by makecldf'.format(d))
+        return
+    batch = args.batch or contentupdates.batch_name(d)
+
+    operations = contentupdates.read_operations(d)
+    index = contentupdates.Index(ds.cldf_reader(), batch)
+    conflicts = contentupdates.apply(index, operations)
+    for loc, op, e in conflicts:
+        args.log.warning('{}: {}: {}'.format(loc, op.__title__, e))
+    args.log.info('{} of {} operations applied'.format(
+        len(operations) - len(conflicts), len(operations)))
+    if not args.dry_run:
+        for table in index.write():
+            args.log.info('{} written'.format(table))
+        args.log.warning(
+            'Copy {} to {} as "{} Content Updates" to keep the updates when running '
+            'makecldf'.format(d, ds.raw_dir, batch))
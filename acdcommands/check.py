@@ -16,34 +16,20 @@ LanguageTable:PCMP 5
 LanguageTable:EMP 3
 
 """
+import csv
+import sys
+import json
+import pathlib
+import contextlib
 import collections
 
-from tqdm import tqdm
-import newick
 from lexibank_acd import Dataset
 
 import acdparser
+from acdcldf.links import LinkValidator, markdown_columns
+from acdcldf.tree import ProtoLanguageTree
 
-TREE = newick.loads(acdparser.TREE)[0]
-
-
-def node_to_root():
-    def get_all_paths(node):
-        if len(node.descendants) == 0:
-            return [[node.name]]
-        return [
-            [node.name] + path for child in node.descendants for path in get_all_paths(child)
-        ]
-    def yield_subsets(s):
-        for i in range(len(s)):
-            yield s[0:i+1]
-    res = []
-    for p in get_all_paths(TREE):
-        res.extend(list(yield_subsets(p)))
-    return {p[0]: p for p in [list(reversed(s)) for s in set([tuple(r) for r in res])]}
-
-
-N2R = node_to_root()
+TREE = ProtoLanguageTree(acdparser.TREE)
 
 
 def closest_pl(group, pls):
@@ -51,45 +37,76 @@ def closest_pl(group, pls):
     # follow the branch leading to the corresponding pl up to the root,
     # first node in pls is the "best".
     #
-    for pl in N2R.get(group,  []):
-        if pl in pls:
-            return pl
+    return TREE.nearest_ancestor(group, pls)
+
+
+def register(parser):
+    parser.add_argument(
+        '--format',
+        help='Format for reporting the results of the CLDF Markdown link validation.',
+        choices=['text', 'json', 'csv'],
+        default='text')
+    parser.add_argument(
+        '--output',
+        help='Path of a file to write JSON or CSV results to (defaults to stdout).',
+        type=pathlib.Path,
+        default=None)
+    parser.add_argument(
+        '--state',
+        help='Path of the file to store validation state in (defaults to '
+             '.cache/check-markdown.json in the repository).',
+        type=pathlib.Path,
+        default=None)
+    parser.add_argument(
+        '--workers',
+        help='Number of processes to use for validating the rows of each column.',
+        type=int,
+        default=None)
+    parser.add_argument(
+        '--full',
+        help='Validate all rows, not only the ones which changed since the last run.',
+        action='store_true',
+        default=False)
 
 
 def run(args):
-    from pycldf.ext.markdown import CLDFMarkdownText
-
-    missing = collections.Counter()
-
-    class TestMarkdown(CLDFMarkdownText):
-        def render_link(self, cldf_link):
-            try:
-                self.get_object(cldf_link)
-            except:
-                missing.update(['{}:{}:{}'.format(cldf_link.label, cldf_link.table_or_fname, cldf_link.objid)])
-
-    cldf = Dataset().cldf_reader()
-    cols = []
-    for t in cldf.tables:
-        try:
-            tname = cldf.get_tabletype(t)
-        except ValueError:
-            tname = None
-        tname = tname or str(t.url)
-        for col in t.tableSchema.columns:
-            if col.common_props.get('dc:conformsTo') == 'CLDF Markdown':
-                cols.append((tname, col.name))
-
-    for t, c in cols:
+    ds = Dataset()
+    cldf = ds.cldf_reader()
+    validator = LinkValidator(
+        cldf,
+        state=None if args.full else (args.state or ds.dir / '.cache' / 'check-markdown.json'),
+        workers=args.workers)
+
+    results = []
+    for t, c in markdown_columns(cldf):
         args.log.info('validating CLDF Markdown in {}:{}'.format(t, c))
-        for obj in tqdm(cldf[t]):
-            if obj[c] and '[' in obj[c]:
-                TestMarkdown(obj[c], cldf).render()
-
-        for k, v in missing.most_common():
-            args.log.warning('Not found {}:{}'.format(k, v))
-        missing = collections.Counter()
-
+        res = validator.validate(t, c)
+        args.log.info('{} of {} rows checked'.format(res.checked, res.rows))
+        if args.format == 'text':
+            for k, v in sorted(res.missing.items(), key=lambda i: (-i[1], i[0])):
+                args.log.warning('Not found {}:{}'.format(k, v))
+        results.append(res)
+    if not args.full:
+        validator.save()
+
+    if args.format != 'text':
+        with (args.output.open('w', encoding='utf8', newline='') if args.output
+              else contextlib.nullcontext(sys.stdout)) as fp:
+            if args.format == 'json':
+                json.dump(
+                    [dict(res._asdict(), missing=sum(res.missing.values()), not_found=dict(
+                        sorted(res.missing.items(), key=lambda i: (-i[1], i[0]))))
+                     for res in results],
+                    fp,
+                    ensure_ascii=False,
+                    indent=2)
+            else:
+                writer = csv.writer(fp)
+                writer.writerow(['table', 'column', 'rows', 'checked', 'links', 'missing'])
+                for res in results:
+                    writer.writerow(
+                        [res.table, res.column, res.rows, res.checked, res.links,
+                         sum(res.missing.values())])
     return
 
     #
@@ -1,14 +1,52 @@
 """
-
+Parse the update documents in raw/updates, printing the etyma - or writing them to a JSON Lines
+file, one etymon per line.
 """
+import json
+import pathlib
+
+from clldutils.clilib import PathType
+
 from acdparser import updates
 
 from lexibank_acd import Dataset
 
 
+def register(parser):
+    parser.add_argument(
+        '--updates-dir',
+        help="Directory containing the update documents as '*.odt' (defaults to raw/updates).",
+        type=PathType(type='dir'),
+        default=None)
+    parser.add_argument(
+        '--output',
+        help='Path of a JSON Lines file to write the etyma to.',
+        type=pathlib.Path,
+        default=None)
+    parser.add_argument(
+        '--workers',
+        help='Number of processes to use for parsing the documents (with --output).',
+        type=int,
+        default=None)
+
+
 def run(args):
     ds = Dataset()
-    for p in sorted(ds.raw_dir.joinpath('updates').glob('*.odt'), key=lambda p_: p_.stem):
+    paths = sorted(
+        (args.updates_dir or ds.raw_dir.joinpath('updates')).glob('*.odt'), key=lambda p_: p_.stem)
+    if args.output:
+        n = 0
+        with args.output.open('w', encoding='utf8') as fp:
+            for p, records in zip(paths, updates.iter_records(paths, workers=args.workers)):
+                args.log.info('{}: {} etyma'.format(p, len(records)))
+                for rec in records:
+                    fp.write(json.dumps(rec, ensure_ascii=False))
+                    fp.write('\n')
+                    n += 1
+        args.log.info('{} etyma written to {}'.format(n, args.output))
+        return
+
+    for p in paths:
         args.log.info(str(p))
         for etymon, forms, note in updates.parse(p, verbose=True):
             pass
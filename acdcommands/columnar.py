@@ -0,0 +1,30 @@
+"""
+Export the CLDF tables to typed columnar files (Arrow IPC format), for fast, memory-mapped access.
+
+See `acdcldf.columnar` for the file format and the loader. Requires `pyarrow`.
+"""
+import pathlib
+
+from lexibank_acd import Dataset
+
+
+def register(parser):
+    parser.add_argument(
+        '--outdir',
+        help='Directory to write the files to (defaults to columnar/ in the repository).',
+        type=pathlib.Path,
+        default=None)
+    parser.add_argument(
+        'table',
+        nargs='*',
+        help='Names of the tables to export (defaults to all tables).')
+
+
+def run(args):
+    try:
+        from acdcldf.columnar import export
+    except ImportError:  # pragma: no cover
+        args.log.error('acd.columnar requires pyarrow: pip install -e .[columnar]')
+        return
+    ds = Dataset()
+    export(ds.cldf_reader(), args.outdir or ds.dir / 'columnar', tables=args.table, log=args.log)
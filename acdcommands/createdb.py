@@ -0,0 +1,23 @@
+"""
+Create an SQLite database from the CLDF data, with indexes and materialized views for fast queries.
+
+See `acdcldf.db` for the tables added to the schema created by `cldf createdb`.
+"""
+import pathlib
+
+from lexibank_acd import Dataset
+from acdcldf.db import create
+
+
+def register(parser):
+    parser.add_argument(
+        '--db',
+        help='Path of the SQLite database file (defaults to acd.sqlite in the repository).',
+        type=pathlib.Path,
+        default=None)
+
+
+def run(args):
+    ds = Dataset()
+    path = create(ds.cldf_reader(), args.db or ds.dir / 'acd.sqlite', log=args.log)
+    args.log.info('{} created'.format(path))
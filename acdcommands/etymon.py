@@ -1,67 +1,170 @@
 """
 Display an etymon, i.e. a cognate set, including subsets.
+
+Many etyma can be looked up in one go using `--batch`, or via HTTP from a local server started
+with `--serve`.
 """
+import re
+import json
+import decimal
+import argparse
+import functools
 import itertools
-import collections
+import http.server
+import unicodedata
+import urllib.parse
 
 from bs4 import BeautifulSoup
 from markdown import markdown
 from termcolor import colored
 import newick
-from pycldf.trees import TreeTable
 
 from lexibank_acd import Dataset
+from acdcldf.index import EtymonIndex
 
 
 def register(parser):
-    parser.add_argument('etymon')
+    parser.add_argument(
+        'etymon',
+        nargs='?',
+        help='Name or ID of an etymon.',
+        default=None)
     parser.add_argument('--with-reconstruction-tree', action='store_true', default=False)
+    parser.add_argument(
+        '--rebuild-index',
+        help='Rebuild the etymon index, even if the CLDF data has not changed.',
+        action='store_true',
+        default=False)
+    parser.add_argument(
+        '--format',
+        choices=['text', 'json'],
+        default='text')
+    parser.add_argument(
+        '--batch',
+        metavar='FILE',
+        help="Look up the etyma listed in FILE, one per line (or read them from stdin, if FILE "
+             "is '-').",
+        type=argparse.FileType('r', encoding='utf8'),
+        default=None)
+    parser.add_argument(
+        '--serve',
+        metavar='PORT',
+        help="Serve etymon lookups via HTTP on localhost, e.g. "
+             "`curl http://localhost:PORT/qeCeŋ?format=json&with-reconstruction-tree`",
+        type=int,
+        default=None)
 
 
 def run(args):
-    cldf = Dataset().cldf_reader()
-    for tree in TreeTable(cldf):
-        tree = tree.newick()
-        break
-
-    langs = {l['ID']: l for l in cldf['LanguageTable']}  # Lookup for language metadata.
-    forms = {l['ID']: l for l in cldf['FormTable']}  # Lookup for form metadata.
-
-    rlevels = [langs[n.name]['Abbr'] for n in tree.walk()]
-
-    for row in cldf['etyma.csv']:  # Find the referenced etymon.
-        if (row['Name'].replace('*', '') == args.etymon.replace('*', '')) or (row['ID'] == args.etymon):
-            ety = row
-            break
-    else:
-        raise ValueError('Unknown etymon: {}'.format(args.etymon))
-
-    # Aggregate the subsets linked to the etymon:
-    css = [
-        (row, [], row['Is_Main_Entry'])
-        for row in cldf['CognatesetTable'] if row['Etymon_ID'] == ety['ID']]
-    for row in cldf['CognateTable']:
-        for cs, cogs, _ in css:
-            if row['Cognateset_ID'] == cs['ID']:
-                cogs.append(row)
-
-    # Aggregate the linked cf sets:
-    cfsets = collections.defaultdict(list)
-    for row in cldf['cf.csv']:
-        if row['Cognateset_ID']:
-            cfsets[row['Cognateset_ID']].append(row)
+    index = EtymonIndex.from_dataset(Dataset(), rebuild=args.rebuild_index)
+
+    if args.serve:
+        serve(index, args.serve, args.format, args.with_reconstruction_tree)
+        return
+
+    if args.batch:
+        first = True
+        for line in args.batch:
+            etymon = line.strip()
+            if etymon and not etymon.startswith('#'):
+                try:
+                    res = lookup(index, etymon, args.format, args.with_reconstruction_tree)
+                except ValueError as e:
+                    args.log.error(str(e))
+                    continue
+                if args.format == 'text' and not first:
+                    print('\n' + '=' * 72 + '\n')
+                print(res)
+                first = False
+        return
+
+    if not args.etymon:
+        raise ValueError('An etymon must be specified, if neither --batch nor --serve is used.')
+    print(lookup(index, args.etymon, args.format, args.with_reconstruction_tree))
+
+
+def lookup(index, etymon, fmt='text', with_reconstruction_tree=False):
+    try:
+        data = index[etymon]  # Find the referenced etymon.
+    except KeyError:
+        raise ValueError('Unknown etymon: {}'.format(etymon))
+    if fmt == 'json':
+        return json.dumps(
+            etymon_json(etymon, data), ensure_ascii=False, default=lambda o: float(o)
+            if isinstance(o, decimal.Decimal) else str(o))
+    return format_etymon(data, index, with_reconstruction_tree=with_reconstruction_tree)
+
+
+def etymon_json(query, data):
+    def item(key, t):
+        return {key: t[0], 'form': t[1], 'language': t[2]}
+
+    return dict(
+        query=query,
+        etymon=data['etymon'],
+        subsets=[dict(
+            cognateset=subset['cognateset'],
+            cognates=[item('cognate', c) for c in subset['cognates']],
+            cfsets=[
+                dict(cfset=cf, items=[item('item', i) for i in items])
+                for cf, items in subset['cfsets']],
+        ) for subset in data['subsets']],
+    )
+
+
+def serve(index, port, fmt, with_reconstruction_tree):
+    """
+    Serve etymon lookups via HTTP, i.e. requests for `/<etymon>`, optionally with query parameters
+    `format=json|text` and `with-reconstruction-tree`.
+    """
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urllib.parse.urlparse(self.path)
+            params = urllib.parse.parse_qs(url.query, keep_blank_values=True)
+            f = params.get('format', [fmt])[0]
+            try:
+                res = lookup(
+                    index,
+                    urllib.parse.unquote(url.path.strip('/')),
+                    f,
+                    with_reconstruction_tree or 'with-reconstruction-tree' in params)
+                status = 200
+            except ValueError as e:
+                res, status = str(e), 404
+            body = res.encode('utf8')
+            self.send_response(status)
+            self.send_header(
+                'Content-Type',
+                'application/json' if f == 'json' and status == 200
+                else 'text/plain; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    index.in_memory()
+    # Requests are handled sequentially, in the thread which opened the index.
+    with http.server.HTTPServer(('localhost', port), Handler) as server:
+        print('Serving etymon lookups on http://localhost:{}/'.format(port))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:  # pragma: no cover
+            pass
+
+
+def format_etymon(data, index, with_reconstruction_tree=False):
+    tree, levels = newick.loads(index.tree)[0], index.proto_tree
 
     lines = []
     pfs = {node.name: '' for node in tree.walk()}
-    for i, (cs, cogs, main) in enumerate(css):  # Display each subset.
+    for i, subset in enumerate(data['subsets']):  # Display each subset.
+        cs, main = subset['cognateset'], subset['cognateset']['Is_Main_Entry']
         if i > 0:
             lines.append('---')
-        cogs = [(cog, forms[cog['Form_ID']], langs[forms[cog['Form_ID']]['Language_ID']]) for cog in cogs]
         cogs = sorted(
-            cogs,
+            subset['cognates'],
             key=lambda c: (
-                rlevels.index(c[2]['Group']),
-                0 if c[2]['Abbr'] in rlevels else 1,
+                levels.rank(c[2]['Group']),
+                0 if c[2]['Abbr'] in levels else 1,
                 0 if c[2]['Is_Proto'] else 1,
                 # sort langs within group: North to South, except Oceanic: West to East
                 -(c[2]['Latitude'] or 0) if c[2]['Group'] != 'POC' else abs(c[2]['Longitude'] or 0),
@@ -91,26 +194,22 @@ def run(args):
                         sound_change += 'ᴬ'
                     lines.append('\t{}\t{}{}\t{}'.format(fmt_lang(lang['Name']), fmt_form(form['Value']), sound_change, fmt_meaning(form['Description'])))
 
-        for cfset in cfsets.get(cs['ID'], []):
+        for cfset, items in subset['cfsets']:
             lines.append('Also')
-            for item in cldf['cfitems.csv']:
-                if item['Cfset_ID'] == cfset['ID']:
-                    form = forms[item['Form_ID']]
-                    lang = langs[form['Language_ID']]
-                    lines.append('\t{}\t{}\t{}'.format(fmt_lang( lang['Name']), fmt_form(form['Value']), fmt_meaning(form['Description'])))
+            for item, form, lang in items:
+                lines.append('\t{}\t{}\t{}'.format(fmt_lang( lang['Name']), fmt_form(form['Value']), fmt_meaning(form['Description'])))
 
         if cs['Comment']:
             lines.append('\nNOTE: ' + fmt_comment(cs['Comment']))
 
 
-    if ety['Comment']:
-        lines.append('\nNOTE: ' + fmt_comment(ety['Comment']))
+    if data['etymon']['Comment']:
+        lines.append('\nNOTE: ' + fmt_comment(data['etymon']['Comment']))
 
-    if args.with_reconstruction_tree:
-        t = newick.loads(tree.newick)[0]
-        t.rename(auto_quote=True, **pfs)
-        lines = [t.ascii_art()] + lines
-    print('\n'.join(lines))
+    if with_reconstruction_tree:
+        tree.rename(auto_quote=True, **pfs)
+        lines = [tree.ascii_art()] + lines
+    return '\n'.join(lines)
 
 
 def fmt_form(s):
@@ -135,10 +234,127 @@ def fmt_group(s):
     return colored(s, 'green')
 
 
+# Markdown constructs handled by `render_comment` - i.e. paragraphs, `[label](url)` links and
+# unambiguous `_emphasis_` - and anything else, which is rendered via HTML.
+LINK = re.compile(r'(?<!!)\[(?P<label>[^\[\]]*)\]\((?P<url>[^\s()<>"\']*)\)')
+PLACEHOLDER = re.compile('\x02([0-9]+)\x03')
+UNSUPPORTED = re.compile(
+    r'[`\\<*\t\r\x02\x03]|&(?!ast;)|__|^[ ]|^(?:[#>=+-]|[0-9]+\.)', re.MULTILINE)
+
+
 def fmt_comment(t):
     """
     '<p>Also <a href="LanguageTable#cldf:279">Ilokano</a> <em>kúrad</em> ‘contagious affection of the skin characterized by the appearance of discolored whitish patches covered with vesicles or powdery scales, and at times itching greatly; a kind of tetter or ringworm’, <a href="LanguageTable#cldf:18314">Karo Batak</a> <em>kudil</em> ‘scabies’, <em>kudil-en</em> ‘suffer from scabies’, <a href="LanguageTable#cldf:285">Javanese</a> <em>kuḍas</em> ‘ringworm’, <a href="LanguageTable#cldf:404">Sasak</a> <em>kurék</em> ‘scabies, itch’.</p>'
     """
+    return render_comment(t)
+
+
+@functools.lru_cache(maxsize=2 ** 14)
+def render_comment(t):
+    """
+    Render CLDF Markdown for the terminal, tokenizing links and emphasis in one pass.
+
+    The result is identical to `render_comment_html`, which is used as fallback for Markdown
+    which isn't handled here.
+    """
+    if UNSUPPORTED.search(t) or re.search(r'[\[\]]', LINK.sub('', t)):
+        return render_comment_html(t)
+    paras = []
+    for block in (t + '\n\n').split('\n\n'):
+        if block.strip():
+            para = render_inline(block.lstrip())
+            if para is None:
+                return render_comment_html(t)
+            paras.append(para)
+    return '\n'.join(paras).replace('&ast;', '*')
+
+
+def char_class(c):
+    if not c:
+        return 'edge'
+    if c.isspace():
+        return 'space'
+    if c in '\x02\x03':
+        return 'token'
+    return 'punct' if unicodedata.category(c)[0] in 'PS' else 'word'
+
+
+def emphasis(t):
+    """
+    Match `_` delimiters following the rules for left- and right-flanking delimiter runs.
+
+    :return: `list` of (start, end) spans of emphasized text, or `None` if delimiters can not be \
+    matched by simply pairing openers and closers.
+    """
+    spans, start = [], None
+    for m in re.finditer('_', t):
+        i = m.start()
+        before, after = char_class(t[i - 1:i]), char_class(t[i + 1:i + 2])
+        if 'token' in (before, after):
+            return None
+        left = after not in ('edge', 'space') and (
+            after != 'punct' or before in ('edge', 'space', 'punct'))
+        right = before not in ('edge', 'space') and (
+            before != 'punct' or after in ('edge', 'space', 'punct'))
+        if left and (not right or before == 'punct') and start is None:
+            start = i
+        elif right and (not left or after == 'punct') and start is not None:
+            spans.append((start, i + 1))
+            start = None
+        elif left or right:
+            return None
+    return spans if start is None else None
+
+
+def render_inline(t):
+    """
+    :return: The rendered paragraph or `None`, if it contains constructs which aren't handled.
+    """
+    # Rendered inline elements, and how they are rendered within emphasized text:
+    tokens, plain = [], []
+
+    def token(s, p=None):
+        tokens.append(s)
+        plain.append(s if p is None else p)
+        return '\x02{}\x03'.format(len(tokens) - 1)
+
+    def render(s, emphasized=False):
+        if re.search(r'\x03(?! \x02|\n\x02| $)\s+(\x02|$)', s):
+            # Whitespace between inline elements is normalized by the HTML parser.
+            raise ValueError(s)
+        return PLACEHOLDER.sub(lambda m: (plain if emphasized else tokens)[int(m.group(1))], s)
+
+    def substitute(s, func):
+        spans = emphasis(s)
+        if spans is None:
+            raise ValueError(s)
+        res, pos = [], 0
+        for start, end in spans:
+            res.extend([s[pos:start], func(s[start + 1:end - 1])])
+            pos = end
+        res.append(s[pos:])
+        return render(''.join(res))
+
+    def link(m):
+        label, url = m.group('label'), m.group('url')
+        if '\n' in label:
+            raise ValueError(label)
+        text = substitute(label, lambda s: s)
+        if url.startswith('LanguageTable'):
+            return token(fmt_lang(text))
+        if url.startswith('Source'):
+            return token(colored(text, attrs=['underline']))
+        return token(substitute(label, lambda s: token(fmt_form(s))), text)
+
+    try:
+        t = LINK.sub(link, t)
+        t = re.sub('  \n', lambda m: token('') + '\n', t)  # Line breaks.
+        return substitute(t, lambda s: token(fmt_form(render(s, emphasized=True))))
+    except ValueError:
+        return None
+
+
+def render_comment_html(t):
     bs = BeautifulSoup(markdown(t), 'lxml')
     for a in bs.find_all('a'):
         if a['href'].startswith('LanguageTable'):
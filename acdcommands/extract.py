@@ -0,0 +1,107 @@
+"""
+Re-extract the data from the HTML pages of the legacy ACD at https://trussel2.com/ACD/
+"""
+import json
+import pathlib
+
+from clldutils.clilib import PathType
+
+import acdparser
+from acdparser.parser import BACKENDS
+from acdparser.cache import Cache
+from acdparser.compact import Compactor
+from acdparser.refs import SourceIndex
+
+from lexibank_acd import Dataset
+
+
+def register(parser):
+    parser.add_argument(
+        'html',
+        metavar='HTML_DIR',
+        help="Directory containing the 'acd-*.htm' pages.",
+        type=PathType(type='dir'))
+    parser.add_argument(
+        '--output',
+        help='Path of a JSON file to write the extracted data to.',
+        type=pathlib.Path,
+        default=None)
+    parser.add_argument(
+        '--workers',
+        help='Number of processes to use for parsing the pages.',
+        type=int,
+        default=None)
+    parser.add_argument('--backend', choices=BACKENDS, default='bs4')
+    parser.add_argument(
+        '--no-cache',
+        help='Parse all pages from scratch, without looking up or storing objects in the cache.',
+        action='store_true',
+        default=False)
+    parser.add_argument(
+        '--cache-dir',
+        help='Directory to store the parse cache in (defaults to .cache/html in the repository).',
+        type=pathlib.Path,
+        default=None)
+    parser.add_argument(
+        '--cache-max-size',
+        help='Maximal size of the cache in MB.',
+        type=int,
+        default=500)
+    parser.add_argument(
+        '--cache-max-age',
+        help='Maximal age of cache entries in days.',
+        type=int,
+        default=90)
+    parser.add_argument(
+        '--compact',
+        help='Keep the parsed objects as compact records, with refs as indices into a table of '
+             'refs - which is written to the JSON output as well.',
+        action='store_true',
+        default=False)
+    parser.add_argument(
+        '--bib',
+        help='BibTeX file to check the cited references with, matching the labels in the "key" '
+             'field - e.g. etc/sources.bib (defaults to the sources on the bibliography page).',
+        type=PathType(type='file'),
+        default=None)
+
+
+def run(args):
+    cache = None
+    if not args.no_cache:
+        cache = Cache(
+            args.cache_dir or Dataset().dir / '.cache' / 'html',
+            max_size=args.cache_max_size * 1024 * 1024,
+            max_age=args.cache_max_age)
+    diagnostics = []
+    compactor = Compactor() if args.compact else None
+    source_index = SourceIndex.from_bibtex(args.bib) if args.bib else None
+    sources, langs, etyma, loans, noise, near, roots = acdparser.parse(
+        args.html,
+        workers=args.workers,
+        backend=args.backend,
+        cache=cache,
+        diagnostics=diagnostics,
+        compact=compactor,
+        source_index=source_index)
+    if args.output:
+        with args.output.open('w', encoding='utf8') as fp:
+            json.dump(
+                dict(
+                    refs=compactor.refs if compactor else None,
+                    sources=list(sources.values()),
+                    languages=list(langs.values()),
+                    etyma=etyma,
+                    loansets=loans,
+                    noise=noise,
+                    near=near,
+                    roots=roots,
+                    unresolved=[dg._asdict() for dg in diagnostics],
+                    missed_languages=dict(acdparser.MISSED.most_common()),
+                    unresolved_refs=dict(source_index.missed.most_common())
+                    if source_index else None,
+                ),
+                fp,
+                cls=acdparser.JsonEncoder,
+                ensure_ascii=False,
+                indent=2)
@@ -0,0 +1,20 @@
+"""
+Rebuild the CLDF data incrementally after changes to etc/glosses.csv, etc/brax.tsv,
+etc/metathesis.tsv or etc/assimilation.tsv - using the manifest written by makecldf.
+"""
+from acdcldf import incremental
+
+from lexibank_acd import Dataset
+
+
+def run(args):
+    ds = Dataset()
+    try:
+        tables = incremental.rebuild(ds, log=args.log)
+    except ValueError as e:
+        args.log.error(str(e))
+        return
+    if not tables:
+        args.log.info('Nothing to rebuild')
+    for table in tables:
+        args.log.info('{} written'.format(table))
@@ -29,6 +29,7 @@ import collections
 import matplotlib.pyplot as plt
 
 from lexibank_acd import Dataset
+from acdcldf.db import connect
 
 ECOUNT_DIFFS = {
     'a': 20,  # +5 2021-08-01.odt, +15 2021-09-13.odt
@@ -64,17 +65,24 @@ def run_cmd(cmd):
         shlex.split(cmd) if isinstance(cmd, str) else cmd).decode("utf-8")
 
 
+def register(parser):
+    parser.add_argument(
+        '--force',
+        help='Re-create acd.sqlite if it lacks the materialized views of acd.createdb, e.g. '
+             'because it was created with `cldf createdb`.',
+        action='store_true',
+        default=False)
+
+
 def run(args):
+    # Queries use the materialized views created by `cldfbench acd.createdb`, see `acdcldf.db`:
     sql_aNak_1 = """select
-    count(distinct l.cldf_id) as nlangs 
-from 
-    languagetable as l
-  join formtable as f on f.cldf_languagereference = l.cldf_id 
-  join cognatetable as c on f.cldf_id = c.cldf_formreference 
-  join cognatesettable as cs on c.cldf_cognatesetreference = cs.cldf_id
-  join `etyma.csv` as e on cs.etymon_id = e.cldf_id
-where 
-    l.is_proto = false and cs.is_main_entry = true and e.cldf_name = '*aNak';"""
+    count(distinct r.language_id) as nlangs
+from
+    etymon_reflexes as r
+  join `etyma.csv` as e on r.etymon_id = e.cldf_id
+where
+    r.is_proto = false and r.is_main_entry = true and e.cldf_name = '*aNak';"""
 
     cmd_ex1 = 'cldfbench acd.etymon qeCeŋ --with-reconstruction-tree'
     cmd_ex2 = 'cldfbench acd.etymon kudis'
@@ -84,6 +92,11 @@ where
 
     ds = Dataset()
     cldf = ds.cldf_reader()
+    try:
+        db = connect(cldf, ds.dir / 'acd.sqlite', force=args.force, log=args.log)
+    except ValueError as e:
+        args.log.error('{} - or use --force'.format(e))
+        return
     lcounts = {r['ID']: r for r in ds.etc_dir.read_csv('lcounts.tsv', delimiter='\t', dicts=True)}
     #
     # We have identified words when they had same form and meaning description, and split forms
@@ -149,12 +162,15 @@ where
     ecount_cmd = [
         'sqlite3',
         'acd.sqlite',
-        'select initial, count(cldf_id) from "etyma.csv" group by initial order by lower(initial)',
+        'select initial, etyma from grapheme_counts order by lower(initial)',
         '-separator', ','
     ]
-    ps = subprocess.Popen(ecount_cmd, stdout=subprocess.PIPE)
-    ecount_res = subprocess.check_output(['termgraph'], stdin=ps.stdout).decode("utf-8")
-    ps.wait()
+    ecount_res = subprocess.run(
+        ['termgraph'],
+        input=''.join('{},{}\n'.format(*row) for row in db.execute(ecount_cmd[2])),
+        stdout=subprocess.PIPE,
+        encoding='utf-8',
+        check=True).stdout
 
     md = """# Validating the ACD dataset'
 
@@ -172,7 +188,7 @@ The legacy HTML pages list the numbers of cognate sets as follows:
 
 Recomputing such numbers for the current dataset is simple. Running
 ```
-$ {} | grep termgraph
+$ {} | termgraph
 ```
 we get
 ```
@@ -296,7 +312,9 @@ The paper states that
 > haRezan ‘step or rung of a ladder’, PMP *anak i mata ‘pupil of the eye’, and *anak i
 > panaq ‘arrow’.
 
-Counting distinct languages of reflexes for a set can be done with the following query:
+Counting distinct languages of reflexes for a set can be done with the following query - using the
+table `etymon_reflexes`, which materializes the join of `CognatesetTable`, `CognateTable`, `FormTable`
+and `LanguageTable` in the database created by running `cldfbench acd.createdb`:
 ```sql
 {}
 ```
@@ -328,6 +346,6 @@ sqlite> select exists(select cs.cldf_name from cognatesettable as cs, `etyma.csv
         cmd_ex4,
         run_cmd(cmd_ex4),
         sql_aNak_1,
-        run_cmd(['sqlite3', 'acd.sqlite', '-header', sql_aNak_1]),
+        'nlangs\n{}'.format(db.execute(sql_aNak_1).fetchone()[0]),
     )
     ds.dir.joinpath('VALIDATION.md').write_text(md, encoding='utf-8')
@@ -45,6 +45,9 @@ import collections
 from nameparser import HumanName
 
 from acdparser.parser import *
+from acdparser.index import FormIndex
+from acdparser.resolver import LanguageResolver
+from acdparser.refs import SourceIndex
 
 SUBGROUPS = {
     'Form.': ('Formosan', ''),
@@ -74,6 +77,13 @@ SUBGROUPS = {
 #PSF
 
 INVALID_LANGS = ['Kaniet (Thilenius)']
+# Languages of forms in sets, which are not listed on the language pages:
+IGNORED_LANGUAGES = {
+    'root': ['Mb(T)', 'LgW', 'TYPE', 'LgL', 'LgS', 'SB', 'KADAYAN', '(??) *', 'SUB(S)', 'MOO'],
+    'near': ['PPn', 'Batangan'],
+    'noise': ['RHB', 'TND', 'LON', 'MUR'],
+    'loan': ['NGA', 'RNB', 'PCS', 'K-K', 'CRAM'],
+}
 RECONCSTRUCTIONS = collections.OrderedDict([
     ('PAN', 'Proto-Austronesian'),
     ('PMP', 'Proto-Malayo-Polynesian'),
@@ -92,7 +102,7 @@ class JsonEncoder(json.JSONEncoder):
     def default(self, obj):
         if hasattr(obj, '__json__'):
             return obj.__json__()
-        if isinstance(obj, set):
+        if isinstance(obj, (set, frozenset)):
             return sorted(obj)
         if isinstance(obj, HumanName):
             return {'first': obj.first, 'middle': obj.middle, 'last': obj.last}
@@ -101,9 +111,15 @@ class JsonEncoder(json.JSONEncoder):
 
 MISSED = collections.Counter()
 
+
 def repl(languages_by_name, s):
-    from fuzzywuzzy import fuzz
+    """
+    Replace `__language__<name>__` markup with links to the languages.
 
+    :param languages_by_name: `LanguageResolver` or `dict` mapping language names to IDs.
+    """
+    resolve = languages_by_name if isinstance(languages_by_name, LanguageResolver) \
+        else LanguageResolver(languages_by_name)
     res = []
     start = '__language__'
     while start in s:
@@ -111,31 +127,62 @@ def repl(languages_by_name, s):
         res.append(b)
         lname, rem = rem.split('__', maxsplit=1)
         lname = re.sub('\s+', ' ', lname.strip())
-        if lname in languages_by_name:
-            res.append('[{}](languages/{})'.format(lname, languages_by_name[lname]))
+        lid = resolve(lname)
+        if lid is not None:
+            res.append('[{}](languages/{})'.format(lname, lid))
         else:
-            for name, lid in languages_by_name.items():
-                if fuzz.token_sort_ratio(name, lname) > 99.0:
-                    res.append('[{}](languages/{})'.format(lname, lid))
-                    break
-            else:
-                MISSED.update([lname])
-                res.append(lname)
+            MISSED.update([lname])
+            res.append(lname)
         s = rem
     res.append(s)
     return ''.join(res)
 
 
-def parse(d):
-    sources = {}
-    for src in SourceParser(d):
-        #if src.key in sources:
-        #    raise ValueError(src.key)
-        sources[src.key] = src
+def form_type(f):
+    return 'root' if f.is_root else ('proto' if f.is_proto else 'form')
+
+
+# Types of the events yielded by `iter_parse`:
+SOURCE, LANGUAGE, ROOT, NEAR, NOISE, LOAN, ETYMON, STATS = \
+    'source', 'language', 'root', 'near', 'noise', 'loan', 'etymon', 'stats'
+Event = collections.namedtuple('Event', 'type obj')
+
+
+def iter_parse(
+        d, workers=None, backend='bs4', cache=None, diagnostics=None, source_index=None):
+    """
+    Parse the legacy HTML pages of the ACD in directory `d`, yielding objects as soon as they are
+    validated - i.e. cross-checked with the forms listed on the language pages.
+
+    Events are yielded in the following order:
+    - `SOURCE` events, for each source from the bibliography,
+    - `ROOT`, `NEAR`, `NOISE`, `LOAN` and `ETYMON` events - in this order - for each set of the
+      respective module,
+    - `LANGUAGE` events, since forms of languages are updated from the sets,
+    - one `STATS` event with a `dict` of summary statistics.
+
+    Only the languages - i.e. the forms listed on the language pages - are kept in memory until
+    all sets are checked. Everything else can be processed and discarded by the consumer.
+
+    :param workers: Number of processes to use for parsing the pages of each module.
+    :param backend: HTML parsing backend, see `acdparser.parser.BACKENDS`.
+    :param cache: `acdparser.cache.Cache` instance, to re-use objects parsed from unchanged pages.
+    :param diagnostics: `list` to which forms in sets which could not be resolved to forms on the \
+    language pages are appended as `acdparser.index.Diagnostic`.
+    :param source_index: `acdparser.refs.SourceIndex` to check the cited references with - \
+    defaulting to the sources from the bibliography page.
+    """
+    kw = dict(workers=workers, backend=backend, cache=cache)
+    source_keys = []
+    for src in SourceParser(d, **kw):
+        source_keys.append(src.key)
+        yield Event(SOURCE, src)
+    if source_index is None:  # Sources are indexed by their labels:
+        source_index = SourceIndex((key, key) for key in source_keys)
 
     refs = collections.Counter()
     langs = collections.OrderedDict()
-    for lang in LanguageParser(d):
+    for lang in LanguageParser(d, **kw):
         refs.update([r for r, _ in lang.iter_refs()])
         langs[lang.id] = lang
     langs[19629].abbr = 'pwmc'
@@ -143,13 +190,16 @@ def parse(d):
     # So now, language names and ids are unique.
     lang_id_by_name = {l.name: lid for lid, l in langs.items()}
 
-    loids = {l.id for l in LoanParser(d)}
+    loansets = list(LoanParser(d, **kw))
+    loids = {l.id for l in loansets}
 
-    forms, linked_sets = set(), set()
+    # Numbers of forms, roots and protoforms, updated when forms are changed on the Set pages:
+    stats = collections.Counter()
+    linked_sets = set()
     for l in langs.values():
         for form in l.forms:
             refs.update([r for r, _ in form.iter_refs()])
-            forms.add((l.name, form.form))
+            stats[form_type(form)] += 1
             ns = set()
             for cat, no in form.sets:
                 if cat == 'lo' and int(no) not in loids:
@@ -162,225 +212,156 @@ def parse(d):
             form.sets = ns
 
     # We provide language forms for simple lookup:
-    forms_by_lang = {}
-    for l in langs.values():
-        forms_by_lang[l.name] = {(f.form, f.gloss.plain): f for f in l.forms}
-    for l in langs.values():
-        # Proto forms are listed with abbreviated language name.
-        if l.abbr and l.abbr not in forms_by_lang:
-            forms_by_lang[l.abbr] = forms_by_lang[l.name]
+    index = FormIndex(langs.values())
 
     lang_id_by_name.update({plid: plid for plid in RECONCSTRUCTIONS})
     for gid, (gname, _) in SUBGROUPS.items():
         lang_id_by_name[gid] = gid
         lang_id_by_name[gname] = gid
 
-    rootsets = []
-    for s in RootParser(d):
-        rootsets.append(s)
+    for s in RootParser(d, **kw):
         refs.update([r for r, _ in s.iter_refs()])
         for f in s.forms:
-            if f.language in [
-                # FIXME: log these!?
-                'Mb(T)', 'LgW', 'TYPE', 'LgL', 'LgS', 'SB', 'KADAYAN', '(??) *', 'SUB(S)', 'MOO',
-            ]:
-                continue
-            assert f.language in forms_by_lang, f.language
-            if (f.form, f.gloss.plain) not in forms_by_lang[f.language]:
-                # FIXME: log these!
-                #print('{}: {} {}'.format(f.language, f.form, f.gloss.plain))
-                # Rembong: bunit peel the stalks of vegetables
-                # Bungku: wita earth, land
-                # Manggarai: wituk swaying the body, posturing
-                pass
-            else:
-                form = forms_by_lang[f.language][f.form, f.gloss.plain]
+            form = index.lookup('root', s.id, f, ignore=IGNORED_LANGUAGES['root'])
+            if form:
                 assert ('r', str(s.id)) in form.sets, '{} "{}": {} -- {}'.format(form.form, form.gloss.plain, form.sets, s.id)
+        yield Event(ROOT, s)
 
-    nearsets = []
-    for near in NearParser(d):
-        nearsets.append(near)
+    for near in NearParser(d, **kw):
         refs.update([r for r, _ in near.iter_refs()])
         for f in near.forms:
-            if f.language in [
-                'PPn', 'Batangan'
-            ]:
-                # FIXME: log these!
-                continue
-            if (f.form, f.gloss.plain) not in forms_by_lang[f.language]:
-                #print('{}: {} {}'.format(f.language, f.form, near.gloss))
-                # Rarotongan: tino body
-                # Malay: mə-ləcit fly off: fly off, squirt out
-                # Palawano: deŋen river otter
-                pass
-            else:
-                form = forms_by_lang[f.language][f.form, f.gloss.plain]
+            form = index.lookup('near', near.id, f, ignore=IGNORED_LANGUAGES['near'])
+            if form:
                 assert ('near', str(near.id)) in form.sets, '{} "{}": {} -- {}'.format(form.form, form.gloss.plain, form.sets, near.id)
+        yield Event(NEAR, near)
 
-    noisesets = []
-    for noise in NoiseParser(d):
-        noisesets.append(noise)
+    for noise in NoiseParser(d, **kw):
         refs.update([r for r, _ in noise.iter_refs()])
         for f in noise.forms:
-            if f.language in [
-                'RHB', 'TND', 'LON', 'MUR',
-            ]:
-                # FIXME: log these!
-                continue
-            if (f.form, f.gloss.plain) not in forms_by_lang[f.language]:
-                pass
-                #print('{}: {} {}'.format(f.language, f.form, noise.gloss))
-                # Thao: taqtaq adze something: chop, split, adze something
-                # Paiwan: ŋasŋas be out of breath: pant, be out of breath
-                # Tagalog: dúkit cut off
-                # Ilokano: tata elder sibling: father, uncle, elder sibling
-                # Malagasy: pelika fan: vibrate, fan
-                # Balinese: tuli fast
-                # Samoan: tafa-tafa flank: side, flank
-                # Tagalog: kubót fold, wrinkle
-                # Tagalog: labág free, on the loose
-                # Old Javanese: a-sisib-an glide off, slide off
-                # Old Javanese: taŋtaŋ grip, grasp
-                # Tagalog: kugkog grate: to grate
-                # Tagalog: sabád hindrance
-                # Toba Batak: dahop join together
-                # Tausug: kawin marry: wedding, to marry
-                # Sinaugoro: gepa mat
-                # Tagalog: kirót pain
-                # Malagasy: dzuluka (a bar to prevent entrance pierce, skewer
-                # Tagalog: lúlos slip off
-                # Tagalog: layláy spread out
-                # Ngaju Dayak: lawas stand open
-                # Malay: lawas stand open
-                # Tagalog: kaykay stand up
-                # Paiwan: tjiptjip suck
-                # Ilokano: kahút take with hand
-                # Tagalog: pásaŋ wooden implement
-            else:
-                form = forms_by_lang[f.language][f.form, f.gloss.plain]
+            form = index.lookup('noise', noise.id, f, ignore=IGNORED_LANGUAGES['noise'])
+            if form:
                 assert ('n', str(noise.id)) in form.sets, '{} -- {}'.format(form.sets, noise.id)
+        yield Event(NOISE, noise)
 
-    loans = []
-    for loan in LoanParser(d):
-        loans.append(loan)
+    for loan in loansets:
         refs.update([r for r, _ in loan.iter_refs()])
         for f in loan.forms:
-            if f.language in [
-                'NGA', 'RNB', 'PCS', 'K-K', 'CRAM',
-            ]:
-                continue
-            if (f.form, f.gloss.plain) not in forms_by_lang[f.language]:
-                pass
-                #print('{}: {} {}'.format(f.language, f.form, loan.gloss))
-                # Bikol: mag-gúlpi all at once: sudden(ly), all at once
-                # Ilokano: limós alms
-                # Tae': tadi-i artificial cockspur
-                # Agutaynen: láŋka Artocarpus: jackfruit Artocarpus spp.
-                # Toba Batak: pisaŋ banana
-                # Casiguran Dumagat: kahíl Bitter orange Seville orange: Citrus aurantium
-                # Hanunóo: kahíl Bitter orange Seville orange: Citrus aurantium
-                # Ilokano: Insík Chinese
-                # Tagalog: Insík Chinese
-                # Tagalog: sigih-an continue
-                # Binukid: ka-piaŋ crippled, lame
-                # Sundanese: gedoŋ bicara discussion: speak, discussion
-                # Bontok: talóŋ eggplant
-                # Casiguran Dumagat: búrupickled ipon fish: pickled fish
-                # Pazeh: ʔa:kúŋ grandfather
-                # Samoan: ʔava kava: Piper methysticum
-                # Toba Batak: undaŋ law
-                # Javanese: unḍaŋ law
-                # Ilokano: líra lyre
-                # Sundanese: tilam quilt mattress thin cover to sleep on
-                # Maranao: talompaʔ ~ tarompaʔ sandal
-                # Paiwan: ts<alʸ>ebak shoot
-                # Malay: pandak ~ pendek short
-                # Tagalog: tíbay sound: well-made structurally sound
-                # Ibaloy: pison steamroller
-                # Tboli: atis Sweetsop: Annona squamosa
-                # Ilokano: kaʔiŋin swidden
-                # Tagalog: kaʔiŋin swidden
-                # Cebuano: kaʔiŋin swidden
-                # Malay: pədaŋ sword
-                # Hanunóo: kaládiʔ taro variety
-                # Tagalog: tuksó temptation; to tempt
-                # Bikol: ma-tipíd thrifty
-                # Bikol: título title (to land)
-                # Bontok: tabáko tobacco
-                # Agutaynen: pabo turkey
-                # Malay: pəñəŋat wasp
-            else:
-                form = forms_by_lang[f.language][f.form, f.gloss.plain]
+            form = index.lookup('loan', loan.id, f, ignore=IGNORED_LANGUAGES['loan'])
+            if form:
                 form.sets.add(('lo', str(loan.id)))
                 form.is_loan = True
+        yield Event(LOAN, loan)
+    del loansets
 
     # Now we cross-check the forms listed on the Words pages:
-    for w in WordParser(d):
+    for w in WordParser(d, **kw):
         if w.language in INVALID_LANGS:
             continue
-        # All languages are recoginzed - either by name or by lowercase abbreviation:
-        assert (w.language in forms_by_lang) or (w.language.lower() in forms_by_lang), w.language
-        forms = forms_by_lang.get(w.language, forms_by_lang.get(w.language.lower()))
-        # All forms are found among the forms listed on the language pages:
-        assert (w.form, w.gloss.plain) in forms, '{}: "{}" {}'.format(w.language, w.form, w.gloss.plain)
+        # All languages are recoginzed - either by name or by lowercase abbreviation - and all
+        # forms are found among the forms listed on the language pages:
+        assert index.lookup('word', w.cognateset, w, lowercase=True), \
+            '{}: "{}" {}'.format(w.language, w.form, w.gloss.plain)
+
+    resolver = LanguageResolver(lang_id_by_name)
 
     # Now check the Set pages:
-    sets, etyma = set(), collections.defaultdict(set)
-    cognates = list(EtymonParser(d))
-    for e in cognates:
+    # We index the etyma by set ID, and collect the linked sets and etyma as we go:
+    etymon_by_set, linked, linked_etyma = {}, 0, set()
+    for e in EtymonParser(d, **kw):
         if e.note:
-            e.note.markdown = repl(lang_id_by_name, e.note.markdown)
+            e.note.markdown = repl(resolver, e.note.markdown)
         refs.update([r for r, _ in e.iter_refs()])
         for s in e.sets:
             if s.note:
-                s.note.markdown = repl(lang_id_by_name, s.note.markdown)
+                s.note.markdown = repl(resolver, s.note.markdown)
             refs.update([r for r, _ in s.iter_refs()])
-            etyma[e.id].add(s.id)
-            if s.id in sets:
+            if s.id in etymon_by_set:
                 raise ValueError(s.id)
-            sets.add(s.id)
+            etymon_by_set[s.id] = e.id
+            if s.id in linked_sets:
+                linked += 1
+                linked_etyma.add(e.id)
             for f in s.forms:
                 if f.language in INVALID_LANGS:
                     continue
-                assert f.language in forms_by_lang, f.language
-                form = f.form
-                if f.note:
-                    form = '{} ({})'.format(form, f.note)
-                assert (form, f.gloss.plain) in forms_by_lang[f.language], '{}: "{}" {}'.format(f.language, form, f.gloss.plain)
-                lform = forms_by_lang[f.language][(form, f.gloss.plain)]
+                lform = index.lookup('set', s.id, f, with_note=True)
+                assert lform, '{}: "{}" {}'.format(f.language, f.form, f.gloss.plain)
                 assert ('s', str(s.id)) in lform.sets or (('f', str(s.id)) in lform.sets), '{} -- {}'.format(lform.sets, s.id)
                 lform.form = f.form
                 lform.note = f.note
+                stats[form_type(lform)] -= 1
                 lform.is_root = f.is_root
+                stats[form_type(lform)] += 1
                 lform.ass = f.ass
                 lform.met = f.met
+        yield Event(ETYMON, e)
+
+    for lang in langs.values():
+        yield Event(LANGUAGE, lang)
+
+    if diagnostics is not None:
+        diagnostics.extend(index.diagnostics)
+    if cache:
+        cache.prune()
+    yield Event(STATS, dict(
+        forms=sum(stats.values()),
+        languages=len(langs),
+        roots=stats['root'],
+        protoforms=stats['proto'],
+        linked_sets=linked,
+        linked_etyma=len(linked_etyma),
+        sources_referenced=len(refs),
+        references=sum(refs.values()),
+        unresolved_refs=source_index.check(refs),
+        unresolved_language_names=len(resolver.missed),
+        unresolved_forms=collections.Counter(dg.reason for dg in index.diagnostics),
+    ))
 
-    #
-    # FIXME:
-    # - check refs with sources
-    #
-    linked_etyma = set()
-    for sid in sets.intersection(linked_sets):
-        for eid, sids in etyma.items():
-            if sid in sids:
-                linked_etyma.add(eid)
-                break
-
-    # some stats:
-    forms, roots, proto = 0, 0, 0
-    for l in langs.values():
-        for f in l.forms:
-            if f.is_root:
-                roots += 1
-            elif f.is_proto:
-                proto += 1
-            else:
-                forms += 1
-
-    print('{} forms in {} languages ({} roots, {} protoforms)'.format(forms + roots + proto, len(langs), roots, proto))
+
+def parse(
+        d, workers=None, backend='bs4', cache=None, diagnostics=None, compact=None,
+        source_index=None):
+    """
+    Parse the legacy HTML pages of the ACD in directory `d`, see `iter_parse`.
+
+    :param compact: `acdparser.compact.Compactor` instance. If passed, the parsed objects are \
+    returned as compact records, see `acdparser.compact`.
+    :return: 7-tuple (sources, languages, etyma, loan sets, noise sets, near sets, root sets)
+    """
+    sources, langs = {}, collections.OrderedDict()
+    res = {type_: [] for type_ in [ETYMON, LOAN, NOISE, NEAR, ROOT]}
+    for event in iter_parse(
+            d,
+            workers=workers,
+            backend=backend,
+            cache=cache,
+            diagnostics=diagnostics,
+            source_index=source_index):
+        obj = compact(event.obj) if compact and event.type != STATS else event.obj
+        if event.type == SOURCE:
+            #if obj.key in sources:
+            #    raise ValueError(obj.key)
+            sources[obj.key] = obj
+        elif event.type == LANGUAGE:
+            langs[obj.id] = obj
+        elif event.type == STATS:
+            stats = obj
+        else:
+            res[event.type].append(obj)
+    if compact:
+        compact.clear()
+
+    print('{} forms in {} languages ({} roots, {} protoforms)'.format(
+        stats['forms'], stats['languages'], stats['roots'], stats['protoforms']))
     print('assigned to {} cognate sets grouped in {} etyma'.format(
-        len(sets.intersection(linked_sets)),
-        len(linked_etyma),
-    ))
-    print('{} sources referenced {} times'.format(len(refs), sum(refs.values())))
-    return sources, langs, cognates, loans, noisesets, nearsets, rootsets
+        stats['linked_sets'], stats['linked_etyma']))
+    print('{} sources referenced {} times'.format(
+        stats['sources_referenced'], stats['references']))
+    print('{} references to {} sources not resolved'.format(
+        sum(stats['unresolved_refs'].values()), len(stats['unresolved_refs'])))
+    print('{} language names in notes not resolved'.format(stats['unresolved_language_names']))
+    print('{} forms in sets not resolved: {}'.format(
+        sum(stats['unresolved_forms'].values()),
+        ', '.join('{} {}'.format(n, reason)
+                  for reason, n in stats['unresolved_forms'].most_common())))
+    return sources, langs, res[ETYMON], res[LOAN], res[NOISE], res[NEAR], res[ROOT]
@@ -0,0 +1,103 @@
+"""
+A content-addressed cache for the objects parsed from the legacy HTML pages.
+
+Objects are stored per page and parser, keyed by the SHA-256 of the page content and a version
+hash of the code which determines what is parsed from a page (i.e. the HTML fixes, the parser, the
+model classes and the helpers they import from `acdparser` and `acdparser.refs`).
+"""
+import os
+import time
+import pickle
+import hashlib
+import pathlib
+
+from .fixes import FIXER
+
+__all__ = ['Cache']
+
+
+def code_version():
+    h = hashlib.sha256()
+    for name in ['__init__.py', 'parser.py', 'models.py', 'util.py', 'fixes.py', 'refs.py']:
+        h.update(pathlib.Path(__file__).parent.joinpath(name).read_bytes())
+    # Page-specific fixes may also be registered at runtime:
+    h.update(FIXER.fingerprint().encode('utf8'))
+    return h.hexdigest()
+
+
+class Cache:
+    """
+    Objects are pickled - detached from their HTML chunks, see `acdparser.models.Item.detach`.
+    Note that we cannot use the JSON serialization, because `__json__` is lossy (e.g. for `Ref`).
+    """
+    suffix = '.pickle'
+
+    def __init__(self, d, max_size=None, max_age=None):
+        """
+        :param d: Cache directory.
+        :param max_size: Maximal size of the cache in bytes. If exceeded, least recently used \
+        entries are evicted.
+        :param max_age: Maximal age of cache entries in days.
+        """
+        self.dir = pathlib.Path(d)
+        self.max_size = max_size
+        self.max_age = max_age
+        self.version = code_version()
+
+    def key(self, parser, p):
+        h = hashlib.sha256(self.version.encode('utf8'))
+        h.update('{}:{}'.format(parser.__class__.__name__, parser.backend).encode('utf8'))
+        h.update(p.read_bytes())
+        return h.hexdigest()
+
+    def path(self, key):
+        return self.dir / key[:2] / (key + self.suffix)
+
+    def get(self, key):
+        p = self.path(key)
+        if p.exists():
+            try:
+                with p.open('rb') as fp:
+                    res = pickle.load(fp)
+            except Exception:  # A corrupt entry is just a miss.
+                return None
+            os.utime(p)  # We keep track of usage to evict the least recently used entries.
+            return res
+
+    def set(self, key, objects):
+        p = self.path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first, so that concurrent workers never see partial entries.
+        tmp = p.parent / '{}.{}.tmp'.format(p.name, os.getpid())
+        with tmp.open('wb') as fp:
+            pickle.dump(objects, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(p)
+
+    def __iter__(self):
+        if self.dir.exists():
+            yield from self.dir.glob('*/*' + self.suffix)
+
+    def prune(self):
+        """
+        Evict expired entries and - if the cache is too big - the least recently used ones.
+
+        :return: The number of evicted entries.
+        """
+        entries, evicted = [], 0
+        now = time.time()
+        for p in self:
+            stat = p.stat()
+            if self.max_age is not None and now - stat.st_mtime > self.max_age * 24 * 60 * 60:
+                p.unlink()
+                evicted += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, p))
+        if self.max_size is not None:
+            size = sum(e[1] for e in entries)
+            for _, s, p in sorted(entries, key=lambda e: e[0]):
+                if size <= self.max_size:
+                    break
+                p.unlink()
+                size -= s
+                evicted += 1
+        return evicted
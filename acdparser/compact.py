@@ -0,0 +1,146 @@
+"""
+A compact in-memory representation of the objects parsed from the legacy HTML pages.
+
+Instances of the model classes in `acdparser.models` are mutable - `acdparser.parse` fixes them up
+while cross-checking the modules. Once parsing is done, they can be turned into records, i.e.
+slotted and frozen copies of the model instances, without the `html` attribute, where
+
+- names of languages, groups and proto-languages as well as set categories and numbers are
+  interned,
+- lists and sets are turned into tuples and frozensets,
+- refs are stored as integer indices into a table of distinct `Ref` records.
+
+Record classes have the same names and fields (except `html`) as the model classes and support
+the same JSON serialization.
+"""
+import sys
+import weakref
+
+import attr
+
+from . import models
+
+__all__ = ['Record', 'Compactor', 'RECORDS']
+
+# Names of fields holding short, frequently repeated strings:
+INTERNED = {
+    'language', 'group', 'name', 'abbr', 'proto_language', 'parent_language', 'isocode', 'location'}
+
+
+class Record:
+    __slots__ = ()
+
+
+def record_class(cls):
+    """
+    :return: A slotted, frozen `attr.s` class with the fields of model class `cls` except `html` \
+    and with the properties and JSON serialization of `cls`.
+    """
+    members = {}
+    for klass in reversed(cls.__mro__):
+        for name, member in vars(klass).items():
+            if isinstance(member, property) or name == '__json__':
+                members[name] = member
+    res = attr.make_class(
+        cls.__name__,
+        [f.name for f in attr.fields(cls) if f.name != 'html'],
+        bases=(Record,),
+        slots=True,
+        frozen=True)
+    for name, member in members.items():
+        setattr(res, name, member)
+    # Make records picklable, by registering the classes as members of this module:
+    res.__module__, res.__qualname__ = __name__, cls.__name__
+    globals()[cls.__name__] = res
+    return res
+
+
+# Map model classes to record classes:
+RECORDS = {
+    cls: record_class(cls) for cls in
+    [getattr(models, name) for name in models.__all__] if issubclass(cls, models.Item)}
+
+
+class Compactor:
+    """
+    Turns model instances into records. Objects referenced more than once - e.g. a `Note` shared
+    by a form in a set and the form on the language page - are turned into one record, as long as
+    the model instance is alive. The compactor only keeps weak references to model instances, so
+    they can be garbage collected once converted.
+
+    Usage:
+
+    >>> compactor = Compactor()
+    >>> sources, langs, *_ = parse(d, compact=compactor)
+    >>> [compactor.refs[i].label for i in langs[19190].refs]
+    ['Jacobson 1999']
+    """
+    def __init__(self):
+        # The table of distinct refs, i.e. `Ref` records:
+        self.refs = []
+        self._refs = {}
+        self._records = {}
+
+    @staticmethod
+    def intern(s):
+        return sys.intern(s) if isinstance(s, str) else s
+
+    def ref(self, ref):
+        """
+        :return: Index of the `Ref` record for `ref` in `Compactor.refs`.
+        """
+        key = (ref.key, ref.label, ref.year)
+        if key not in self._refs:
+            self._refs[key] = len(self.refs)
+            self.refs.append(RECORDS[models.Ref](*(self.intern(s) for s in key)))
+        return self._refs[key]
+
+    def convert(self, value):
+        if isinstance(value, models.Item):
+            return self(value)
+        if isinstance(value, (list, tuple)):
+            return tuple(
+                self.intern(v) if isinstance(v, str) else self.convert(v) for v in value)
+        if isinstance(value, (set, frozenset)):
+            return frozenset(
+                self.intern(v) if isinstance(v, str) else self.convert(v) for v in value)
+        return value
+
+    def __call__(self, obj):
+        """
+        :param obj: Instance of a model class.
+        :return: Record for `obj`.
+        """
+        key = id(obj)
+        if key in self._records:
+            wref, record = self._records[key]
+            if wref() is obj:
+                return record
+        kw = {}
+        for f in attr.fields(obj.__class__):
+            if f.name == 'html':
+                continue
+            value = getattr(obj, f.name)
+            if f.name == 'refs':
+                value = tuple(self.ref(ref) for ref in value)
+            elif f.name in INTERNED:
+                value = self.intern(value)
+            else:
+                value = self.convert(value)
+            kw[f.name] = value
+        record = RECORDS[obj.__class__](**kw)
+        # The entry is removed when `obj` is garbage collected - before its id can be re-used:
+        self._records[key] = (weakref.ref(obj, self._forget(key)), record)
+        return record
+
+    def _forget(self, key):
+        def callback(ref):
+            if self._records.get(key, (None,))[0] is ref:
+                del self._records[key]
+        return callback
+
+    def clear(self):
+        """
+        Drop the memo of converted model instances, once all objects have been converted.
+        """
+        self._records = {}
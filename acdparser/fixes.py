@@ -0,0 +1,126 @@
+"""
+Fixes for broken markup in the legacy HTML pages, applied before parsing.
+
+The fixes are specified as ordered list of replacements - and this order matters, because some
+replacements create input for subsequent ones (e.g. `<span>` is fixed to `</span>`, which may then
+be followed by `<a> `). Rather than applying the replacements one after the other to the whole
+page - thus copying multi-megabyte pages many times - we scan pages once for all strings which may
+trigger a fix, and apply the fixes to the (small) windows of text around these triggers only.
+"""
+import re
+import fnmatch
+import functools
+
+__all__ = ['FIXES', 'ANCHOR_FIXES', 'HtmlFixer', 'FIXER']
+
+FIXES = [
+    ('<span class="work"><p>', '<span class="work">'),
+    ('<KAV>', '<span class="lg">Kavalan'),
+    ('<*<span class', '&lt;*<span class'),
+    ('<famg>', '<span class="fam">'),
+    ('<span>', '</span>'),
+    ('</wd?', '</span>'),
+    ('</wad>', '</span>'),
+    ('>/wd>', '</span>'),
+    ('>wd>', '<span class="wd">'),
+    (r'</\wd>', '</span>'),
+    (r'<pkg>', '<span>'),
+    ('t<m>alam', '<span class="wd">talam</span>'),
+    ('</span><a> ', '</span></a> '),
+    ('<p class="pnote"><hr><p class="pnote">', '<p class="pnote"'),
+    (' </span>ka-asgad-án</span> ', ' <span class="wd">ka-asgad-án</span> '),
+]
+# Fixes which are applied to the output of the FIXES, specified as triples
+# (regex, literal, function): A match of the regex, followed by text which the FIXES turn into the
+# literal, is replaced with the return value of the function called with the match.
+ANCHOR_FIXES = [
+    (
+        r'<a name=(?P<abbr>[A-Za-z]+)>',
+        '</span>',
+        lambda m: '<a name="{}"></a>'.format(m.group('abbr'))),
+]
+
+
+class HtmlFixer:
+    """
+    A registry of fixes - global ones and fixes for individual pages.
+
+    Usage:
+
+    >>> FIXER.register('<wd>', '<span class="wd">', glob='acd-s_a.htm')
+    >>> FIXER('...', name='acd-s_a.htm')
+    """
+    def __init__(self, fixes=None, anchor_fixes=None):
+        self.fixes = [(src, t, None) for src, t in (fixes or [])]
+        self.anchor_fixes = list(anchor_fixes or [])
+
+    def register(self, src, target, glob=None):
+        """
+        :param glob: A glob pattern for file names. If specified, the fix is applied to matching \
+        pages only.
+        """
+        self.fixes.append((src, target, glob))
+        self.compiled.cache_clear()
+
+    def fingerprint(self):
+        return repr(self.fixes) + repr([(r, s) for r, s, _ in self.anchor_fixes])
+
+    def rules(self, name=None):
+        return tuple(
+            (src, t) for src, t, glob in self.fixes
+            if glob is None or (name and fnmatch.fnmatch(name, glob)))
+
+    @staticmethod
+    def reference(rules, anchor_fixes, s):
+        """
+        Apply fixes one after the other. This defines the semantics of a set of rules.
+        """
+        for src, t in rules:
+            s = s.replace(src, t)
+        for regex, literal, func in anchor_fixes:
+            s = re.sub(regex + re.escape(literal), func, s)
+        return s
+
+    @functools.lru_cache(maxsize=None)
+    def compiled(self, rules):
+        """
+        :return: pair (regex matching all strings which may trigger a fix, margin)
+        """
+        patterns = [re.escape(src) for src, _ in rules] + [r for r, _, _ in self.anchor_fixes]
+        # A replacement can only create a new match which overlaps with it. Thus, since each fix is
+        # applied once, all text changed by the fixes is within this distance from a trigger:
+        margin = (len(rules) + len(self.anchor_fixes) + 1) * max(
+            [len(src) for src, _ in rules] + [len(lit) for _, lit, _ in self.anchor_fixes] + [1])
+        return re.compile('|'.join(patterns)) if patterns else None, margin
+
+    def __call__(self, s, name=None):
+        """
+        Scan the text for triggers once, and apply the fixes in order only to the windows of text
+        around the triggers. The result is identical to `HtmlFixer.reference`.
+        """
+        rules = self.rules(name)
+        regex, margin = self.compiled(rules)
+        if regex is None:
+            return s
+
+        res, pos, window = [], 0, None
+
+        def flush():
+            res.append(s[pos:window[0]])
+            res.append(self.reference(rules, self.anchor_fixes, s[window[0]:window[1]]))
+            return min(window[1], len(s))
+
+        for m in regex.finditer(s):
+            if window and m.start() - margin <= window[1]:
+                window[1] = m.end() + margin
+                continue
+            if window:
+                pos = flush()
+            window = [max(m.start() - margin, pos), m.end() + margin]
+        if window:
+            pos = flush()
+        res.append(s[pos:])
+        return ''.join(res)
+
+
+FIXER = HtmlFixer(FIXES, ANCHOR_FIXES)
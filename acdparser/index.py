@@ -0,0 +1,86 @@
+"""
+Lookup of the forms listed on the language pages, to cross-check the forms listed in sets.
+"""
+import sys
+import collections
+
+__all__ = ['FormIndex', 'Diagnostic']
+
+Diagnostic = collections.namedtuple('Diagnostic', 'source id language form gloss reason')
+
+
+class FormIndex:
+    """
+    Forms listed on the language pages, indexed by language - i.e. language name or abbreviation -,
+    form and gloss.
+
+    Lookups which cannot be resolved are recorded as `Diagnostic` in `FormIndex.diagnostics`.
+    """
+    IGNORED_LANGUAGE = 'ignored language'
+    UNKNOWN_FORM = 'unknown form'
+
+    def __init__(self, langs):
+        # A single table mapping names and abbreviations to the (interned) language name:
+        self.keys = {}
+        self.forms = {}
+        for lang in langs:
+            name = sys.intern(lang.name)
+            self.keys[name] = name
+            self.forms[name] = {(f.form, f.gloss.plain): f for f in lang.forms}
+        for lang in langs:
+            # Proto forms are listed with abbreviated language name.
+            if lang.abbr and lang.abbr not in self.keys:
+                self.keys[sys.intern(lang.abbr)] = self.keys[lang.name]
+        # Memoized results of `resolve`, with and without lowercase lookup:
+        self._resolved = {False: {}, True: {}}
+        self.diagnostics = []
+
+    def resolve(self, language, lowercase=False):
+        """
+        :param lowercase: Flag signaling whether to try the lowercased name as well (languages on \
+        the Words pages may be given by lowercase abbreviation).
+        :return: The language name or `None`.
+        """
+        resolved = self._resolved[lowercase]
+        if language not in resolved:
+            res = self.keys.get(language)
+            if res is None and lowercase:
+                res = self.keys.get(language.lower())
+            resolved[language] = res
+        return resolved[language]
+
+    def __contains__(self, language):
+        return self.resolve(language) is not None
+
+    def get(self, language, form, gloss, note=None, lowercase=False):
+        """
+        :param note: A note for the form, which is appended to the form on the language pages.
+        :return: The `Form` object listed on the language page or `None`.
+        """
+        if note:
+            form = '{} ({})'.format(form, note)
+        return self.forms[self.resolve(language, lowercase=lowercase)].get((form, gloss))
+
+    def lookup(self, source, sid, f, ignore=(), with_note=False, lowercase=False):
+        """
+        Lookup the language page entry for the form `f` listed in object `sid` of type `source`.
+
+        :param ignore: Languages which are known to not be resolvable.
+        :return: The `Form` object listed on the language page or `None`.
+        """
+        if f.language in ignore:
+            self.report(source, sid, f, self.IGNORED_LANGUAGE)
+            return None
+        assert self.resolve(f.language, lowercase=lowercase), f.language
+        res = self.get(
+            f.language,
+            f.form,
+            f.gloss.plain,
+            note=f.note if with_note else None,
+            lowercase=lowercase)
+        if res is None:
+            self.report(source, sid, f, self.UNKNOWN_FORM)
+        return res
+
+    def report(self, source, sid, f, reason):
+        self.diagnostics.append(Diagnostic(source, sid, f.language, f.form, f.gloss.plain, reason))
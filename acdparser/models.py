@@ -34,6 +34,19 @@ class Item:
         return {
             f.name: getattr(self, f.name) for f in attr.fields(self.__class__) if f.name != 'html'}
 
+    def detach(self):
+        """
+        Drop the references to the HTML chunks - recursively. Since each chunk pins the parse tree
+        of the whole page, this makes objects cheap to keep in memory and to pickle.
+        """
+        self.html = None
+        for f in attr.fields(self.__class__):
+            value = getattr(self, f.name)
+            for v in (value if isinstance(value, (list, set, tuple)) else [value]):
+                if isinstance(v, Item):
+                    v.detach()
+        return self
+
     def iter_refs(self):
         refs = getattr(self, 'refs', [])
         if not refs:
@@ -73,7 +86,13 @@ class SetLike:
         forms = html.find('table', class_=tablecls) if isinstance(tablecls, str) else tablecls
         assert forms
         for tr in forms.find_all('tr'):
-            g = tr.find('td', class_='group')
+            # We look up cells by class - the first cell with a given class wins.
+            cells = {}
+            for td in tr.find_all('td', class_=True):
+                for cls in td['class']:
+                    cells.setdefault(cls, td)
+
+            g = cells.get('group')
             if g:  # A group row.
                 group = g.get_text().strip()
                 continue
@@ -86,15 +105,15 @@ class SetLike:
             # The language name is only specified in the first row of forms for the language.
             # Thus we have to remember it for later forms.
             for lcls in lgcls:
-                if tr.find('td', class_=lcls):
+                if lcls in cells:
                     language = normalize_language(
-                        normalize_string(tr.find('td', class_=lcls).get_text()) or lname)
+                        normalize_string(cells[lcls].get_text()) or lname)
                     break
             else:
                 language = lname
 
             for fcls in formunicls:
-                f = tr.find('td', class_=fcls)
+                f = cells.get(fcls)
                 if f:
                     form = Form(
                         html=tr,
@@ -1,12 +1,60 @@
-import re
+import io
 import itertools
+import functools
+import collections
+import multiprocessing
 
-from bs4 import BeautifulSoup as bs
+from bs4 import Tag, BeautifulSoup as bs
+from lxml import etree
 
 from .models import *
+from .fixes import FIXER
 
 __all__ = ['SourceParser', 'LanguageParser', 'WordParser', 'EtymonParser', 'LoanParser',
-           'NoiseParser', 'NearParser', 'RootParser']
+           'NoiseParser', 'NearParser', 'RootParser', 'BACKENDS']
+
+# With the "bs4" backend, each page is parsed into a BeautifulSoup tree. With the "lxml" backend,
+# pages are parsed incrementally with lxml's `iterparse`, only the chunks encoding object instances
+# are turned into (small) BeautifulSoup trees, which are then passed into the models, and elements
+# are removed from the lxml tree as soon as they have been processed.
+BACKENDS = ['bs4', 'lxml']
+
+
+def has_class(e, classes):
+    """
+    Mimic the class matching used with BeautifulSoup, i.e. `find_all(tag, class_=classes)` if
+    `classes` is a `str` or checking the first class otherwise.
+    """
+    cls = e.get('class', '').split()
+    if isinstance(classes, str):
+        return classes in cls
+    return bool(cls) and cls[0] in classes
+
+
+# Elements which must be serialized as empty tags, when passing lxml elements to BeautifulSoup.
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source',
+    'track', 'wbr'}
+
+
+def tostring(e):
+    """
+    Serialize an lxml element such that it is parsed into the same tree again.
+
+    Note: We can't use lxml's HTML serialization, because this escapes URLs in attributes.
+    """
+    for ee in e.iter():
+        if isinstance(ee.tag, str) and ee.tag not in VOID_ELEMENTS and ee.text is None:
+            ee.text = ''  # Make sure we get an explicit end tag.
+    return etree.tostring(e, encoding='unicode', with_tail=False)
+
+
+def siblings(e, attr):
+    e = getattr(e, attr)()
+    while e is not None:
+        if isinstance(e.tag, str):  # Skip comments and processing instructions.
+            yield e
+        e = getattr(e, attr)()
 
 
 class Parser:
@@ -19,62 +67,163 @@ class Parser:
     __cls__ = None
     __glob__ = 'acd-*.htm'
 
-    def __init__(self, d):
+    def __init__(self, d, workers=None, backend='bs4', cache=None):
+        """
+        :param d: Directory containing the HTML pages of the legacy ACD.
+        :param workers: If a number > 1 is passed, pages are parsed in a pool of as many \
+        processes. Objects are still yielded in the order of the pages.
+        :param backend: One of `BACKENDS`.
+        :param cache: `acdparser.cache.Cache` instance to lookup and store objects per page.
+        """
+        assert backend in BACKENDS, backend
         patterns = [self.__glob__] if isinstance(self.__glob__, str) else self.__glob__
         self.paths = list(itertools.chain(
             *[sorted(list(d.glob(g)), key=lambda p: p.name) for g in patterns]))
+        self.workers = workers
+        self.backend = backend
+        self.cache = cache
 
     def include(self, p):
         return True
 
     @staticmethod
-    def fix_html(s):
-        for src, t in [
-            ('<span class="work"><p>', '<span class="work">'),
-            ('<KAV>', '<span class="lg">Kavalan'),
-            ('<*<span class', '&lt;*<span class'),
-            ('<famg>', '<span class="fam">'),
-            ('<span>', '</span>'),
-            ('</wd?', '</span>'),
-            ('</wad>', '</span>'),
-            ('>/wd>', '</span>'),
-            ('>wd>', '<span class="wd">'),
-            (r'</\wd>', '</span>'),
-            (r'<pkg>', '<span>'),
-            ('t<m>alam', '<span class="wd">talam</span>'),
-            ('</span><a> ', '</span></a> '),
-            ('<p class="pnote"><hr><p class="pnote">', '<p class="pnote"'),
-            (' </span>ka-asgad-án</span> ', ' <span class="wd">ka-asgad-án</span> '),
-        ]:
-            s = s.replace(src, t)
-        s = re.sub(
-            r'<a name=(?P<abbr>[A-Za-z]+)></span>',
-            lambda m: '<a name="{}"></a>'.format(m.group('abbr')),
-            s)
-        return s
+    def fix_html(s, name=None):
+        """
+        :param name: Name of the HTML page, to look up page-specific fixes.
+        """
+        return FIXER(s, name=name)
+
+    def read_html(self, p):
+        s = self.fix_html(p.read_text(encoding='utf8'), name=p.name)
+        if self.backend == 'lxml':
+            # The page is parsed incrementally in `iter_chunks`.
+            return s
+        return bs(s, 'lxml')
 
     def iter_html(self):
         for p in self.paths:
             if self.include(p):
-                yield bs(self.fix_html(p.read_text(encoding='utf8')), 'lxml')
+                yield self.read_html(p)
+
+    def iter_items(self, html):
+        """
+        Select the HTML chunks encoding object instances from a page.
+        """
+        classes = self.__tag__[1]
+        if self.backend == 'lxml':
+            return self.iter_chunks(html)
+        if isinstance(classes, str):
+            return html.find_all(self.__tag__[0], class_=classes)
+        return [
+            i for i in html.find_all(self.__tag__[0], class_=True) if i['class'][0] in classes]
+
+    def preceding(self, e):
+        """
+        Models may look at sibling elements of their HTML chunk. Preceding element siblings of the
+        lxml element `e` must be returned here, as list.
+        """
+        return []
+
+    def following(self, e):
+        """
+        Following element siblings of the lxml element `e`, which models look at, must be yielded
+        here - one at a time, because `iter_chunks` advances the generator only when the next
+        sibling has been parsed completely.
+        """
+        yield from []
+
+    def chunk(self, e):
+        """
+        Turn the lxml element `e` - together with its context - into a BeautifulSoup tree.
+        """
+        preceding = self.preceding(e)
+        soup = bs(
+            ''.join(tostring(ee) for ee in preceding + [e] + list(self.following(e))), 'lxml')
+        return [t for t in soup.body.children if isinstance(t, Tag)][len(preceding)]
+
+    def iter_chunks(self, s):
+        """
+        Parse the page source `s` incrementally, yielding the chunks encoding object instances as
+        soon as they and their context have been parsed completely.
+
+        An item is complete when its parent element has ended or when a later sibling has ended,
+        which is not part of its following context. Once no item is pending, parsed elements are
+        removed from the tree - keeping the last one, because it may be the preceding context of
+        the next item.
+        """
+        tag, classes = self.__tag__
+        pending, open_items = collections.deque(), 0
+        for event, e in etree.iterparse(
+                io.BytesIO(s.encode('utf8')), events=('start', 'end'), html=True, encoding='utf8'):
+            match = e.tag == tag and has_class(e, classes)
+            if event == 'start':
+                open_items += match
+                continue
+            if match:
+                open_items -= 1
+                # We keep the item, the generator of its following context, and whether the
+                # context is complete:
+                pending.append([e, self.following(e), False])
+            parent = e.getparent()
+            for item in pending:
+                if not item[2]:
+                    if e is item[0].getparent():
+                        item[2] = True
+                    elif parent is item[0].getparent() and e is not item[0]:
+                        item[2] = next(item[1], None) is None
+            while pending and pending[0][2]:
+                yield self.chunk(pending.popleft()[0])
+            if not pending and not open_items and parent is not None:
+                while e.getprevious() is not None:
+                    del parent[0]
+        for item in pending:
+            yield self.chunk(item[0])
+
+    def iter_objects(self, html):
+        for e in self.iter_items(html):
+            o = self.__cls__.from_html(e)
+            if o:
+                yield o
+
+    def objects(self, p):
+        """
+        Parse one page into a list of objects, detached from the HTML, i.e. ready for pickling.
+        """
+        if self.cache:
+            key = self.cache.key(self, p)
+            res = self.cache.get(key)
+            if res is None:
+                res = [o.detach() for o in self.iter_objects(self.read_html(p))]
+                self.cache.set(key, res)
+            return res
+        return [o.detach() for o in self.iter_objects(self.read_html(p))]
+
+    def iter_pages(self):
+        """
+        Yield lists of objects per page - in the order of the pages.
+        """
+        paths = [p for p in self.paths if self.include(p)]
+        if self.workers and self.workers > 1 and len(paths) > 1:
+            with multiprocessing.Pool(min(self.workers, len(paths))) as pool:
+                yield from pool.imap(functools.partial(_objects, self), paths)
+        else:
+            # Objects are detached right away, so that the parse tree of a page can be garbage
+            # collected before the next page is read.
+            for p in paths:
+                yield self.objects(p)
 
     def __iter__(self):
         seen = set()
-        for html in self.iter_html():
-            classes = self.__tag__[1]
-            if isinstance(classes, str):
-                items = html.find_all(self.__tag__[0], class_=classes)
-            else:
-                items = [
-                    i for i in html.find_all(self.__tag__[0], class_=True)
-                    if i['class'][0] in classes]
-            for e in items:
-                o = self.__cls__.from_html(e)
-                if o:
-                    oid = getattr(o, 'id', None)
-                    if not oid or (oid not in seen):
-                        yield o
-                    seen.add(oid)
+        for objects in self.iter_pages():
+            for o in objects:
+                oid = getattr(o, 'id', None)
+                if not oid or (oid not in seen):
+                    yield o
+                seen.add(oid)
+
+
+def _objects(parser, p):
+    return parser.objects(p)
 
 
 class EtymonParser(Parser):
@@ -82,6 +231,10 @@ class EtymonParser(Parser):
     __cls__ = Etymon
     __tag__ = ('table', ('settable', 'SettableF'))  # tables class=entrytable + p class=setnote
 
+    def preceding(self, e):
+        # The set number is given in the element preceding the table.
+        return list(itertools.islice(siblings(e, 'getprevious'), 1))
+
 
 class NearParser(Parser):
     """
@@ -177,7 +330,7 @@ class WordParser(Parser):
 
 class SourceParser(Parser):
     __glob__ = 'acd-bib.htm'
-    __tag__ = ('p', 'Bibline')
+    __tag__ = ('p', ('Bibline', 'Bibline2'))
     __cls__ = Source
     #<a name="Clark"></a>
     #</p>
@@ -197,17 +350,16 @@ class SourceParser(Parser):
 <a name="Elgincolin"></a>
 </p> 
     """
-    def __iter__(self):
-        for html in self.iter_html():
-            author = None
-            for e in html.find_all(self.__tag__[0], class_=True):
-                if e['class'][0] == 'Bibline':
-                    res = Source(html=e)
-                    author = res.author
-                    yield res
-                elif e['class'][0] == 'Bibline2':
-                    assert author
-                    yield self.__cls__(html=e, author=author, bibline2=True)
+    def iter_objects(self, html):
+        author = None
+        for e in self.iter_items(html):
+            if e['class'][0] == 'Bibline':
+                res = Source(html=e)
+                author = res.author
+                yield res
+            elif e['class'][0] == 'Bibline2':
+                assert author
+                yield self.__cls__(html=e, author=author, bibline2=True)
 
 
 class LanguageParser(Parser):
@@ -218,6 +370,17 @@ class LanguageParser(Parser):
     def include(self, p):
         return (not p.stem.endswith('2')) and p.stem[-1].islower() #and ('plg' not in p.stem)
 
+    def preceding(self, e):
+        # The abbreviation is given in the element preceding the language line.
+        return list(itertools.islice(siblings(e, 'getprevious'), 1))
+
+    def following(self, e):
+        # Forms are listed in the following paragraphs - up to the first other element.
+        for ee in siblings(e, 'getnext'):
+            yield ee
+            if not (ee.tag == 'p' and has_class(ee, ('formline', 'lbreak'))):
+                break
+
 
 class RootParser(Parser):
     """
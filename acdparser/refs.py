@@ -1,5 +1,30 @@
+"""
+Normalization of the citations in bib links of the legacy ACD - like "Blust (1980:433)" - and
+resolution of the normalized references to sources.
+"""
+import sys
+import functools
+import collections
+
 from .util import normalize_years
 
+__all__ = ['clean_ref', 'SourceIndex']
+
+# Citations are memoized, since the same ones recur thousands of times:
+CACHE_SIZE = 2 ** 14
+# Normalized references, mapped to the label of the source:
+ALIASES = {
+    'Ross 2008':
+    # There's Ross 2008a-g - all in the same collection
+        'Ross, Pawley and Osmond 2008',
+    'Ross 2003':
+    # There's Ross 2003a-c - all in the same collection
+        'Ross, Pawley and Osmond 2003',
+    'Ross and Osmond 2016': 'Ross, Pawley and Osmond 2016',
+    'Ross 2016a': 'Ross 2016',
+    'Osmond 1998': 'Osmond and Ross 1998',
+}
+
 REFS = {
     "Ross 2006": ["Ross 2006a"],  # 6
     "Dempwolff 1938": ["Dempwolff 1934/38"],  # 5
@@ -198,7 +223,13 @@ REFS = {
     "Siregar 1977, Warren 1959": [""],  # 1
 }
 
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
 def clean_ref(ref):
+    """
+    :return: `tuple` of pairs (reference, pages) for a citation - with references as labels like \
+    "Blust 1980", or `''` for citations known to have no source.
+    """
     ref, pages = ref.strip(), ''
     if '(' in ref:
         author, _, rem = ref.partition('(')
@@ -211,20 +242,47 @@ def clean_ref(ref):
 
     ref = normalize_years(ref)
     ref = ref.replace("’s ", ' ').replace("'s ", ' ').replace(', and ', ' and ')
-    ref = {
-        'Ross 2008':
-        # There's Ross 2008a-g - all in the same collection
-            'Ross, Pawley and Osmond 2008',
-        'Ross 2003':
-        # There's Ross 2003a-c - all in the same collection
-            'Ross, Pawley and Osmond 2003',
-        'Ross and Osmond 2016': 'Ross, Pawley and Osmond 2016',
-        'Ross 2016a': 'Ross 2016',
-        'Osmond 1998': 'Osmond and Ross 1998',
-    }.get(ref, ref)
+    ref = ALIASES.get(ref, ref)
     ref = ref.strip()
 
     ref = REFS.get(ref, ref)
     if not isinstance(ref, list):
         ref = [ref]
-    return [(r, pages.strip()) for r in ref]
+    return tuple((sys.intern(r), sys.intern(pages.strip())) for r in ref)
+
+
+class SourceIndex(dict):
+    """
+    Maps labels of sources - like "Ross, Pawley and Osmond 2008", as returned by `clean_ref` - to
+    source IDs.
+    """
+    def __init__(self, *args, **kw):
+        dict.__init__(self, *args, **kw)
+        self.missed = collections.Counter()
+
+    @classmethod
+    def from_bibtex(cls, p):
+        """
+        Index a BibTeX file - like `etc/sources.bib` - with the labels in the `key` field.
+        """
+        from pycldf.sources import Sources
+
+        sources = Sources()
+        sources.read(p)
+        return cls((src['key'], src.id) for src in sources if src.get('key'))
+
+    def resolve(self, citation):
+        """
+        :return: `tuple` of pairs (source ID or `None`, pages) for a citation.
+        """
+        return tuple((self.get(ref), pages) for ref, pages in clean_ref(citation) if ref)
+
+    def check(self, refs):
+        """
+        :param refs: `collections.Counter` of references, as returned by `clean_ref`.
+        :return: `collections.Counter` of the references which cannot be resolved - also added to \
+        `SourceIndex.missed`.
+        """
+        res = collections.Counter({ref: n for ref, n in refs.items() if ref and ref not in self})
+        self.missed.update(res)
+        return res
@@ -0,0 +1,108 @@
+"""
+Resolution of language names as marked up in notes, i.e. `__language__<name>__`.
+"""
+import re
+import difflib
+import collections
+
+__all__ = ['LanguageResolver', 'token_sort_key']
+
+# fuzzywuzzy's processing of strings: Characters in the range 128-255 are removed, other
+# non-alphanumeric characters replaced by whitespace.
+NON_ASCII = dict.fromkeys(range(128, 256))
+NON_ALPHANUMERIC = re.compile(r'(?ui)\W')
+# Two distinct processed strings can only have a `fuzz.token_sort_ratio` > 99 (i.e. a difflib
+# ratio >= 0.995) if both have at least this length:
+MIN_FUZZY_LENGTH = 100
+
+
+def token_sort_key(s):
+    """
+    The string compared by `fuzzywuzzy.fuzz.token_sort_ratio`.
+    """
+    s = NON_ALPHANUMERIC.sub(' ', s.translate(NON_ASCII)).lower()
+    return ' '.join(sorted(s.split()))
+
+
+def ngrams(s, n=3):
+    s = ' {} '.format(s)
+    return {s[i:i + n] for i in range(len(s) - n + 1)}
+
+
+class LanguageResolver:
+    """
+    Resolves language names to IDs.
+
+    Names are matched
+    - exactly,
+    - by token sort key, i.e. with the same result as a scan of all names looking for the first one
+      with `fuzz.token_sort_ratio(name, s) > 99`,
+    - optionally with a similarity (as computed by `difflib.SequenceMatcher.ratio` for token sort
+      keys) of at least `fuzzy`, looking up candidates in a trigram index.
+
+    Results are memoized per name. Names which cannot be resolved are counted in
+    `LanguageResolver.missed`.
+    """
+    def __init__(self, languages_by_name, fuzzy=None):
+        """
+        :param languages_by_name: `dict` mapping language names to IDs.
+        :param fuzzy: Minimal similarity ratio (between 0 and 1) for fuzzy matches.
+        """
+        self.ids = dict(languages_by_name)
+        self.fuzzy = fuzzy
+        self.missed = collections.Counter()
+        self._resolved = {}
+        # Map token sort keys to the index of the first name with this key:
+        self.keys, self.long, self.names = {}, [], list(self.ids)
+        self.ngrams = collections.defaultdict(set)
+        for i, name in enumerate(self.names):
+            key = token_sort_key(name)
+            self.keys.setdefault(key, i)
+            if len(key) >= MIN_FUZZY_LENGTH:
+                self.long.append(i)
+            if fuzzy:
+                for ngram in ngrams(key):
+                    self.ngrams[ngram].add(i)
+
+    def __call__(self, name):
+        """
+        :return: Language ID or `None`.
+        """
+        if name not in self._resolved:
+            self._resolved[name] = self._resolve(name)
+        res = self._resolved[name]
+        if res is None:
+            self.missed.update([name])
+        return res
+
+    def _resolve(self, name):
+        if name in self.ids:
+            return self.ids[name]
+        key = token_sort_key(name)
+        i = self.keys.get(key)
+        if len(key) >= MIN_FUZZY_LENGTH:
+            from fuzzywuzzy import fuzz
+
+            for j in self.long:
+                if i is not None and j > i:
+                    break
+                if fuzz.token_sort_ratio(self.names[j], name) > 99:
+                    i = j
+                    break
+        if i is None and self.fuzzy:
+            i = self._fuzzy(key)
+        return self.ids[self.names[i]] if i is not None else None
+
+    def _fuzzy(self, key):
+        best, res = self.fuzzy, None
+        for i in sorted(set().union(*[self.ngrams.get(ng, set()) for ng in ngrams(key)])):
+            ratio = difflib.SequenceMatcher(None, key, token_sort_key(self.names[i])).ratio()
+            if ratio > best or (res is None and ratio == best):
+                best, res = ratio, i
+        return res
+
+    def report(self):
+        """
+        :return: `list` of pairs (name, number of occurrences) of unresolved names.
+        """
+        return self.missed.most_common()
@@ -1,6 +1,8 @@
 import re
 import zipfile
+import functools
 import itertools
+import multiprocessing
 
 from lxml import etree
 
@@ -35,19 +37,26 @@ def compute_indentation(props):
     return res
 
 
-def transform(e, styles):
+# XPath expressions, compiled once and re-used for all documents:
+STYLES = etree.XPath('.//style:style', namespaces=NS)
+TEXT_PROPERTIES = etree.XPath('style:text-properties', namespaces=NS)
+PARAGRAPH_PROPERTIES = etree.XPath('style:paragraph-properties', namespaces=NS)
+PARAGRAPHS = etree.XPath('.//text:p', namespaces=NS)
+
+
+@functools.lru_cache(maxsize=None)
+def stylesheet(italic, bold):
     """
-    We use XSLT to
-    - replace <text:tab/> tags the text `"___tab___"`
-    - replace <text:span> tags with italic or bold styles with the corresponding markdown formatting
+    Since documents created from the same template share style names, compiled stylesheets are
+    cached by the (frozen) sets of italic and bold style names.
+
+    :param italic: `frozenset` of names of italic text styles.
+    :param bold: `frozenset` of names of bold text styles.
+    :return: Compiled `etree.XSLT` instance.
     """
     tmpl = """<xsl:template match="text:span[@text:style-name='{0}']">{1}<xsl:apply-templates select="node()" />{1}</xsl:template>"""
-    templates = []
-    for name, props in styles.items():
-        if props.get('font-style') == 'italic':
-            templates.append(tmpl.format(name, '_'))
-        elif props.get('font-weight') == 'bold':
-            templates.append(tmpl.format(name, '__'))
+    templates = [tmpl.format(name, '_') for name in sorted(italic)]
+    templates.extend(tmpl.format(name, '__') for name in sorted(bold))
 
     xslt="""\
 <xsl:stylesheet version="1.0" xmlns:xsl="http://www.w3.org/1999/XSL/Transform" {}> 
@@ -61,7 +70,22 @@ def transform(e, styles):
     </xsl:template>
 </xsl:stylesheet>
 """.format(' '.join('xmlns:{}="{}"'.format(k, v) for k, v in NS.items()), '\n'.join(templates))
-    return etree.XSLT(etree.fromstring(xslt.encode('utf8')))(e)
+    return etree.XSLT(etree.fromstring(xslt.encode('utf8')))
+
+
+def transform(e, styles):
+    """
+    We use XSLT to
+    - replace <text:tab/> tags the text `"___tab___"`
+    - replace <text:span> tags with italic or bold styles with the corresponding markdown formatting
+    """
+    italic, bold = set(), set()
+    for name, props in styles.items():
+        if props.get('font-style') == 'italic':
+            italic.add(name)
+        elif props.get('font-weight') == 'bold':
+            bold.add(name)
+    return stylesheet(frozenset(italic), frozenset(bold))(e)
 
 
 def get_styles(d):
@@ -69,10 +93,10 @@ def get_styles(d):
     Read text and paragraph styles from the document.
     """
     res = dict(text=dict(), paragraph=dict())
-    for style in d.xpath('.//style:style', namespaces=NS):
-        for prop in style.xpath('style:text-properties', namespaces=NS):
+    for style in STYLES(d):
+        for prop in TEXT_PROPERTIES(style):
             res['text'][style.get(qname('style', 'name'))] = {k.split('}')[1]: v for k, v in prop.attrib.items()}
-        for prop in style.xpath('style:paragraph-properties', namespaces=NS):
+        for prop in PARAGRAPH_PROPERTIES(style):
             res['paragraph'][style.get(qname('style', 'name'))] = {k.split('}')[1]: v for k, v in prop.attrib.items()}
     return res
 
@@ -105,36 +129,77 @@ def splitline(indent, text):
 
 
 def parse(p, verbose=False):
+    """
+    :return: Generator of triples (etymon, witnesses, note) for the etyma in ODT document `p`.
+    """
     doc = get_content(p)
     styles = get_styles(doc)
     doc = transform(doc, styles['text'])
     indentation = {name: compute_indentation(props) for name, props in styles['paragraph'].items()}
     lines = [
         splitline(indentation.get(p.get(qname('text', 'style-name')), 0), ''.join(p.itertext()))
-        for p in doc.xpath('.//text:p', namespaces=NS)]
+        for p in PARAGRAPHS(doc)]
 
-    yield from iter_etyma(lines)
+    for e, w, n in iter_etyma(lines):
+        if verbose:
+            print_etymon(e, w, n)
+        yield e, w, n
 
-    if verbose:
-        for e, w, n in iter_etyma(lines):
-            print(len(w))
-            #
-            # FIXME: Create Etymon object instances, ready for saving as JSON
-            #
-            print('{}\t{}\t{}'.format(*e))
-            for sg, items in itertools.groupby(w, lambda i: i[0]):
-                print(sg)
-                for lg, forms in itertools.groupby(items, lambda i: i[1]):
-                    print('***', lg)
-                    for i, (_, _, form, gloss) in enumerate(forms):
-                        if i == 0:
-                            print('{}\t{}\t{}'.format(lg, form, gloss))
-                        else:
-                            print('\t{}\t{}'.format(form, gloss))
-            if n:
-                print()
-                print('NOTE: {}'.format(n))
-            print('============================================')
+
+def print_etymon(e, w, n):
+    print(len(w))
+    #
+    # FIXME: Create Etymon object instances, ready for saving as JSON
+    #
+    print('{}\t{}\t{}'.format(*e))
+    for sg, items in itertools.groupby(w, lambda i: i[0]):
+        print(sg)
+        for lg, forms in itertools.groupby(items, lambda i: i[1]):
+            print('***', lg)
+            for i, (_, _, form, gloss) in enumerate(forms):
+                if i == 0:
+                    print('{}\t{}\t{}'.format(lg, form, gloss))
+                else:
+                    print('\t{}\t{}'.format(form, gloss))
+    if n:
+        print()
+        print('NOTE: {}'.format(n))
+    print('============================================')
+
+
+def record(p, etymon, witnesses, note):
+    """
+    :return: `dict` suitable for JSON serialization, representing an etymon from document `p`.
+    """
+    return dict(
+        document=p.name,
+        proto_language=etymon[0],
+        form=etymon[1],
+        gloss=' '.join(etymon[2:]),
+        witnesses=[
+            dict(subgroup=sg, language=lg, form=form, gloss=gloss)
+            for sg, lg, form, gloss in witnesses],
+        note=note,
+    )
+
+
+def parse_records(p):
+    return [record(p, *etymon) for etymon in parse(p)]
+
+
+def iter_records(paths, workers=None):
+    """
+    Parse ODT documents - in a pool of `workers` processes if `workers` > 1.
+
+    :return: Generator of lists of records per document - in the order of `paths`.
+    """
+    paths = list(paths)
+    if workers and workers > 1 and len(paths) > 1:
+        with multiprocessing.Pool(min(workers, len(paths))) as pool:
+            yield from pool.imap(parse_records, paths)
+    else:
+        for p in paths:
+            yield parse_records(p)
 
 
 def get_content(p):
@@ -48,9 +48,13 @@ def set_from_href(a):
     return f.replace('acd-', '').replace('.htm', '').split('_')[0], pid
 
 
+# Year ranges, like "1934-1938" or "1934-38", are normalized to "1934/38":
+FULL_YEAR_RANGE = re.compile(r'\-([0-9]{2})([0-9]{2})')
+YEAR_RANGE = re.compile(r'\-([0-9]{2})')
+
+
 def normalize_years(ref):
-    ref = re.sub(r'\-([0-9]{4})', lambda m: '/' + m.groups()[0][2:], ref)
-    return re.sub(r'\-([0-9]{2})', lambda m: '/' + m.groups()[0], ref)
+    return YEAR_RANGE.sub(r'/\1', FULL_YEAR_RANGE.sub(r'/\2', ref))
 
 
 def parse_form(s, is_proto):
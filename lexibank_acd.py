@@ -3,18 +3,23 @@ import pathlib
 import functools
 import itertools
 import collections
-import unicodedata
 
 import attr
 import newick
 import pylexibank
+from pylexibank.cldf import LexibankWriter
 from clldutils.misc import data_url
-from clldutils.markup import MarkdownLink
 from pycldf import Dataset as CLDFDataset
-from pycldf.ext.markdown import CLDFMarkdownLink
 from csvw.metadata import Datatype
 from pyetymdict.dataset import Language as BaseLanguage, Dataset as BaseDataset
 
+from acdcldf.tree import TREE, PROTO_TREE
+from acdcldf.graphemes import GRAPHEMES, get_initial
+from acdcldf.markdown import MarkdownLinker
+from acdcldf.spool import RowSpool
+from acdcldf.contentupdates import apply_batches
+from acdcldf.incremental import Manifest, MANIFEST, read_tracked, checksums
+
 FORM_FIXES = {  # The only reconstruction starting with "L". Clearly a typo.
     'LapaR₂': 'lapaR₂',
 }
@@ -45,7 +50,6 @@ PROTO_DESC = {
         'language family. In addition, PWMP may not be a valid subgroup, and some forms that are '
         'currently assigned to it may have been found in PMP.',
 }
-TREE = newick.loads('(Form.,((PPH)PWMP,(PCMP,(PSHWNG,POC)PEMP)PCEMP)PMP)PAN;')[0]
 DESCRIPTIONS = {
     'CognatesetTable':
         "Comparisons with regular sound correspondences and close semantics. If there are "
@@ -128,9 +132,6 @@ DESCRIPTIONS = {
         "typically show some kind of irregularity with respect to the proposed reconstruction, but "
         "provide context to evaluate the validity of the cognate set.",
 }
-GRAPHEMES = [
-    'a', 'b', 'c', 'C', 'd', 'e', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'N', 'ñ', 'ŋ', 'o',
-    'p', 'q', 'r', 'R', 's', 'S', 't', 'u', 'w', 'y', 'z']
 
 
 def fixed_form(f):
@@ -143,14 +144,20 @@ def fixed_form(f):
     return f
 
 
-def get_initial(form):
-    # Compute the first grapheme of a reconstruction:
-    first = form.replace('*', '').replace('-', '').replace('(', '').replace('<', '')[0]
-    if first not in GRAPHEMES:
-        # Do away with combining characters!
-        first = unicodedata.normalize('NFD', first)[0]
-    assert first in GRAPHEMES
-    return first
+@functools.lru_cache(maxsize=None)
+def inferred_protolanguages(proto_language, explicit, attested):
+    """
+    :param explicit: Mask of proto-languages with explicit reconstructions.
+    :param attested: Mask of proto-languages with reflexes attested in descendant languages.
+    :return: `tuple` of names of the proto-languages with implicit reconstructions below \
+    `proto_language`.
+    """
+    below = PROTO_TREE.descendants_mask(proto_language, inclusive=False)
+    # An explicit reconstruction excludes its subtree:
+    excluded = 0
+    for name in PROTO_TREE.nodes(explicit & below):
+        excluded |= PROTO_TREE.descendants_mask(name)
+    return tuple(PROTO_TREE.nodes(below & attested & ~excluded))
 
 
 def infer_protoforms(sets):  # Factor out into acdcommand
@@ -175,36 +182,29 @@ def infer_protoforms(sets):  # Factor out into acdcommand
     a cognate set is thus always an explicit reconstruction, although any other proto-form that
     has undergone formal or semantic change from its antecedent is also explicitly indicated.
     """
-    descendants, nodes = collections.defaultdict(set), {}
-    for n in TREE.walk():
-        nodes[n.name] = n
-        descendants[n.name] = {nn.name for nn in n.walk()}
-
-    protoforms = {s['proto_language']: (s['key'], s['gloss']) for s in sets}
+    explicit = PROTO_TREE.mask(s['proto_language'] for s in sets)
     # We can only infer proto-forms when reflexes in a language of the corresponding group are
     # attested.
-    attested = set()
+    attested = 0
     for s in sets:
-        attested = attested.union({'P' + f['group'] for f in s['forms']})
+        for f in s['forms']:
+            if 'P' + f['group'] in PROTO_TREE:
+                attested |= PROTO_TREE.ancestors_mask('P' + f['group'])
 
-    # Loop over the related reconstructions:
     for s in sets:
-        excluded = set()
-        for i, n in enumerate(nodes[s['proto_language']].walk()):
-            if i:
-                # Now we walk the descendants in the proto-language tree.
-                if n.name in excluded:
-                    continue
+        for name in inferred_protolanguages(s['proto_language'], explicit, attested):
+            yield s['id'], name, s['key'], s['gloss']
+
 
-                if n.name in protoforms:
-                    # There's an explicit variation of this reconstruction for this part of the
-                    # tree; thus we exlude all descendants of this node from the search:
-                    excluded = excluded.union(descendants[n.name])
-                    continue
+def infer_all_protoforms(etyma):
+    """
+    Infer proto-forms for all etyma at once.
 
-                if any(pl in attested for pl in descendants[n.name]):
-                    # Reflexes are attested for a language that descended from this proto-language
-                    yield s['id'], n.name, s['key'], s['gloss']
+    :param etyma: Iterable of etyma, i.e. `dict`s with the reconstructions in `sets`.
+    :return: `dict` mapping etymon IDs to `list`s of inferred proto-forms as yielded by \
+    `infer_protoforms`.
+    """
+    return {e['id']: list(infer_protoforms(e['sets'])) for e in etyma}
 
 
 @attr.s
@@ -287,20 +287,27 @@ class Variety(BaseLanguage):
 
 
 class Forms(dict):
+    """
+    Maps v1.2 form IDs to the data of the added forms needed to create cognate sets and cognates -
+    rather than to the full rows, which are spooled to disk.
+    """
+    def add(self, fid, form):
+        self[fid] = (form['ID'], form['Language_ID'], form['Value'], form['Description'])
+
     def id(self, fid):
-        return self[fid]['ID']
+        return self[fid][0]
 
     def lname(self, fid, varieties):
-        return varieties.name(self[fid]['Language_ID'])
+        return varieties.name(self[fid][1])
 
     def form(self, fid):
-        return self[fid]['Value']
+        return self[fid][2]
 
     def meaning(self, fid):
-        return self[fid]['Description']
+        return self[fid][3]
 
     def labbr(self, fid, varieties):
-        return varieties.abbr(self[fid]['Language_ID'])
+        return varieties.abbr(self[fid][1])
 
 
 def root2id(cldf) -> typing.Dict[str, str]:
@@ -359,11 +366,20 @@ def main_reconstruction(rows):
     The main reconstruction in a set of protoforms is the "highest-level" one; i.e. the proto-form
     for the earliest proto-language in the tree.
     """
-    for n in TREE.walk():
-        for row in rows:
-            if row['Proto_Language'].upper() == n.name:
-                return row
-    raise AssertionError('No main reconstruction found')
+    rows = [row for row in rows if row['Proto_Language'].upper() in PROTO_TREE]
+    if not rows:
+        raise AssertionError('No main reconstruction found')
+    return min(rows, key=lambda row: PROTO_TREE.rank(row['Proto_Language'].upper()))
+
+
+class Writer(LexibankWriter):
+    """
+    Applies the batches of content updates in `raw/` - e.g. `raw/2023-04 Content Updates/` - to
+    the CLDF data, once it has been written, i.e. before it is validated.
+    """
+    def write(self, **kw):
+        super().write(**kw)
+        apply_batches(self.cldf, self.dataset.raw_dir, log=self.args.log if self.args else None)
 
 
 class Dataset(BaseDataset):
@@ -380,99 +396,32 @@ class Dataset(BaseDataset):
         strip_inside_brackets=True   # do you want data removed in brackets or not?
     )
 
-    def fix_markdown(self, text, roots=None):
-        if not text:
-            return text
-
-        abbrs, names = {}, {}
-        for l in self.languages:
-            if l['Abbr']:
-                abbrs[l['Abbr']] = l['ID']
-                abbrs[l['Abbr'].lower()] = l['ID']
-            names[l['Name']] = l['ID']
-        names["Sa’a"] = names["Sa'a"]
-        names["Iloko"] = names["Ilokano"]
-        lmap = {k: v for k, v in abbrs.items()}
-        lmap.update(names)
-
-        def link_languages(s):
-            if not s:
-                return None
-            n, with_langs = '', False
-            while '__language__' in s:
-                with_langs = True
-                pre, _, s = s.partition('__language__')
-                n += pre
-                assert '__' in s, s
-                lname, _, s = s.partition('__')
-                if lname in [
-                    'Arabic',
-                    'Portuguese', 'Dutch',
-                    'Spanish',
-                    'Sanskrit',  # https://glottolog.org/resource/languoid/id/sans1269
-                    'Philippine',
-                    'Tamil',  # https://glottolog.org/resource/languoid/id/tami1289
-                    'Hindi',
-                    'Persian',
-                ]:
-                    n += lname
-                    continue
-                if lname.lower() == 'gcph':
-                    n += ('[Greater Central Philippine]'
-                          '(https://glottolog.org/resource/languoid/id/grea1284)')
-                    continue
-                lid = lmap.get(lname)
-                if not lid:
-                    lid = lmap.get(lname.lower())
-                    if not lid:
-                        lid = lmap.get('p' + lname.lower())
-                if lid:
-                    n += '[{}](LanguageTable#cldf:{})'.format(lname, lid)
-                else:
-                    n += lname
-
-            return (n + s).strip().replace('\n\n\n', '\n')
-
-        def repl(ml):
-            if ml.table_or_fname == 'LanguageTable':
-                oid = ml.objid
-                if ml.objid in abbrs:
-                    oid = abbrs[ml.objid]
-                elif ml.objid.upper() in abbrs:
-                    oid = abbrs[ml.objid.upper()]
-                elif 'P' + ml.objid in abbrs:
-                    oid = abbrs['P' + ml.objid]
-                elif not oid and (ml.label in names):
-                    oid = names[ml.label]
-                if oid != ml.objid:
-                    ml.url = 'LanguageTable#cldf:' + oid
-                if not oid:
-                    return ml.label
-            return ml
-
-        res = CLDFMarkdownLink.replace(link_languages(text), repl)
-
-        def repl(ml):
-            if roots and ml.url.startswith('root-acd'):
-                key = ml.label.strip().replace('&ast;', '')
-                if key in roots:
-                    ml.url = 'cf.csv#cldf:{}'.format(roots[key])
-                    removal_marker = '__remove__' if '(' in ml.url else ''
-                    if removal_marker:
-                        assert ')' not in ml.url
-                        return '{}{}'.format(ml, removal_marker)
-                    return ml
-                return ml.label
-            return ml
-
-        res = MarkdownLink.replace(res, repl).replace('__remove__)', '')
-        assert '__remove__' not in res, res
-        return res
+    def cldf_specs(self):
+        spec = super().cldf_specs()
+        spec.writer_cls = Writer
+        return spec
 
     def cmd_makecldf(self, args):
+        # We record what is needed to rebuild the data incrementally, see `acd.rebuild`:
+        manifest = Manifest(rows=read_tracked(self.etc_dir), inputs=checksums(self.dir))
         self.schema(args.writer.cldf)
         self.local_schema(args.writer.cldf)
 
+        # Rows of the large tables are streamed to disk rather than kept in memory. Loan and Cognacy
+        # of forms are only known after all forms have been added, so they are filled in from
+        # lookups keyed by form ID when the rows are written.
+        loans, cognacy = set(), {}
+
+        def annotate_form(form):
+            if form['ID'] in loans:
+                form['Loan'] = True
+            form['Cognacy'] = cognacy.get(form['ID'], form['Cognacy'])
+            return form
+
+        args.writer.objects['FormTable'] = RowSpool(annotate=annotate_form)
+        for table in ['CognateTable', 'cfitems.csv', 'BorrowingTable']:
+            args.writer.objects[table] = RowSpool()
+
         # Add sources
         args.writer.cldf.sources.add(*self.etc_dir.read_bib())
 
@@ -521,27 +470,34 @@ class Dataset(BaseDataset):
         # Add parameters
         meanings = {}  # We copy the meaning descriptions to forms.
         cldf = CLDFDataset.from_metadata(self.raw_dir / 'v1.2' / 'cldf-metadata.json')
+        roots = root2id(cldf)
+        fix_markdown = MarkdownLinker(self.languages, roots=roots)
         for row in cldf['ParameterTable']:
             meanings[row['ID']] = row['Name']
             args.writer.add_concept(**row)
 
         # Add forms
         glosses = {r['Form_ID_v1.2']: r for r in self.etc_dir.read_csv('glosses.csv', dicts=True)}
+        loans.update(row['Target_Form_ID'] for row in cldf['BorrowingTable'])
         forms = Forms()
         for row in cldf['FormTable']:
             row['Description'] = meanings[row['Parameter_ID']]
-            if row['ID'] in glosses:
+            source, glossed = row['Source'], row['ID'] in glosses
+            if glossed:
                 fixed = glosses.pop(row['ID'])
                 if fixed['Source']:
                     row['Source'] = fixed['Source'].split()
                 row['Description'] = fixed['Gloss_Fixed']
-            row['Description'] = self.fix_markdown(row['Description'])
+            row['Description'] = fix_markdown(row['Description'])
             row['Value'] = fixed_form(row['Value'])
             row['Form'] = fixed_form(row['Form'])
             del row['Segments']
             del row['is_proto']
             del row['is_root']
-            forms[row['ID']] = args.writer.add_form(**row)  # map old form ID to new object.
+            form = args.writer.add_form(**row)
+            if form:
+                forms.add(row['ID'], form)  # map old form ID to new form.
+                manifest.add_form(row['ID'], form, source, glossed)
         assert not glosses, 'Not all incorrect glosses have been detected!'
 
         # Split items in CognatesetTable into etyma and cf sets
@@ -550,12 +506,11 @@ class Dataset(BaseDataset):
         dempwolff_info = {
             (r['Category'], r['Set_ID']): r['Etymology']
             for r in self.etc_dir.read_csv('dempwolff_etymologies.csv', dicts=True)}
-        roots = root2id(cldf)
 
         for row in cldf['CognatesetTable']:
             row['Name'] = fixed_form(row.pop('Form'))
             row['Source'] = [src.replace('[]', '') for src in row['Source']]
-            row['Comment'] = self.fix_markdown(row['Comment'], roots=roots)
+            row['Comment'] = fix_markdown(row['Comment'], with_roots=True)
             cat = row.pop('Contribution_ID')
             if cat == 'Canonical':
                 del [row['Proto_Language']]
@@ -597,7 +552,7 @@ class Dataset(BaseDataset):
                     forms.meaning(main['Form_ID'])),
                 Etymon_ID=eid,
                 Form_ID=forms.id(main['Form_ID']),
-                Comment=self.fix_markdown(comments.pop()) if comments else None,
+                Comment=fix_markdown(comments.pop()) if comments else None,
                 Is_Main_Entry=subset is None or (int(subset) == 1),
             ))
             for row in rows:
@@ -613,8 +568,7 @@ class Dataset(BaseDataset):
                 )
 
         # Add cognates and cf items:
-        loans = set()
-        cognates = collections.defaultdict(list)
+        cognates = collections.defaultdict(list)  # Maps (old) form IDs to reconstruction IDs.
         metathesis = {
             r['CID'] for r in self.etc_dir.read_csv('metathesis.tsv', dicts=True, delimiter='\t')}
         assimilation = {
@@ -640,9 +594,15 @@ class Dataset(BaseDataset):
                     forms.form(row['Form_ID']))
                 if brax_key in brax:
                     brax.remove(brax_key)
+                    manifest.add_brax(
+                        brax_key,
+                        row['ID'],
+                        forms.id(row['Form_ID']),
+                        pf2cs[row['Reconstruction_ID']],
+                        row['Reconstruction_ID'])
                     brax_forms[pf2cs[row['Reconstruction_ID']]].append(row['Form_ID'])
                 else:
-                    cognates[forms.id(row['Form_ID'])].append(row['Reconstruction_ID'])
+                    cognates[row['Form_ID']].append(row['Reconstruction_ID'])
                     args.writer.add_cognate(
                         ID=row['ID'],
                         Form_ID=forms.id(row['Form_ID']),
@@ -657,6 +617,8 @@ class Dataset(BaseDataset):
         assert not metathesis, metathesis
         assert not assimilation, assimilation
         assert not brax, 'Not all brax items matched: {}'.format(brax)
+        for fid, rids in cognates.items():
+            cognacy[forms.id(fid)] = ' '.join(sorted(rids, key=int))
 
         # Add groups of bracketed forms as cf items:
         for csid, fids in brax_forms.items():
@@ -672,7 +634,7 @@ class Dataset(BaseDataset):
             row['Name'] = row.pop('Gloss')
             row['Category'] = 'loan'
             del(row['Contribution_ID'])
-            row['Comment'] = self.fix_markdown(row['Comment'])
+            row['Comment'] = fix_markdown(row['Comment'])
             assert '__language_' not in (row['Comment'] or '')
             args.writer.objects['cf.csv'].append(row)
 
@@ -680,13 +642,8 @@ class Dataset(BaseDataset):
         for row in cldf['BorrowingTable']:
             row['Cfset_ID'] = row.pop('Loanset_ID')
             args.writer.objects['BorrowingTable'].append(row)
-            loans.add(row['Target_Form_ID'])
 
-        for form in args.writer.objects['FormTable']:
-            if form['ID'] in loans:
-                form['Loan'] = True
-            if form['ID'] in cognates:
-                form['Cognacy'] = ' '.join(sorted(cognates[form['ID']], key=int))
+        manifest.write(self.dir / MANIFEST)
 
     def local_schema(self, cldf):
         cldf.add_table(
@@ -754,7 +711,7 @@ class Dataset(BaseDataset):
             })
         cldf.add_foreign_key('LanguageTable', 'Dialect_Of', 'LanguageTable', 'ID')
 
-        rlevels = [n.name for n in TREE.walk()]
+        rlevels = PROTO_TREE.names
         cldf['LanguageTable', 'Group'].datatype = Datatype.fromvalue({
             'base': 'string',
             'format': '|'.join(rlevels),
@@ -36,5 +36,8 @@ setup(
         'test': [
             'pytest-cldf',
         ],
+        'columnar': [
+            'pyarrow',
+        ],
     },
 )
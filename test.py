@@ -0,0 +1,454 @@
+import json
+import types
+import collections
+
+import pytest
+
+from lexibank_acd import TREE, infer_protoforms
+from acdparser import (
+    JsonEncoder, SourceParser, LanguageParser, EtymonParser, NearParser, NoiseParser, LoanParser,
+    RootParser, WordParser,
+)
+from acdcldf.spool import RowSpool
+from acdcldf import contentupdates as cu
+
+# Excerpts of pages of the legacy ACD:
+PAGES = {
+    'acd-bib.htm': """\
+<html><body><p class="Bibline"><span class="Author">Clark, Ross.</span> <span class="PubYear">1976.</span>
+<span class="RefTitle"><i>Aspects</i></span><span class="RefText">. Auckland.</span></p>
+<p class="Bibline2">———. <span class="PubYear">2009.</span><span class="RefTitle">Leo</span></p>
+<p class="other">x</p></body></html>""",
+    'acd-l_a.htm': """\
+<html><body>
+<a name="pwmc"></a>
+<p class="langline"><a name="19190"></a>2. <span class="langname">Abaknon</span>
+<span class="langcount">(2)</span>
+<span class="langgroup"><a class="grouplink" href="acd-g_w.htm#Abaknon">WMP</a></span>
+<span class="bibref">(<span class="bib"><a class="bib" href="acd-bib.htm#Jacobson">Jacobson 1999</a></span>)</span>
+<span class="ISOline">[<a class="ISO" href="x"><span class="ISO">abx</span></a>] (<span class="ISOname">Inabaknon</span>) <span class="Loc">Philippines</span></span>
+<span class="aka">[aka: Inabaknon]</span></p>
+<p class="formline"><a href="acd-s_t.htm#7351">tood</a><span class="formdef">knee</span>
+(PMP: *<a class="pform" href="acd-s_t.htm#7351">tuhud</a>) *<a class="setkey" href="acd-s_t.htm#30356">tuduS</a></p>
+<p class="lbreak"></p>
+<p class="formline"><a href="acd-s_w.htm#5954">wa-wawo</a><span class="formdef">eight (<span class="bib"><a class="bib" href="acd-bib.htm#X">X 1999</a></span>)</span></p>
+<p class="dialpara"><a name="819"></a><span class="langname"><a href="#Manobo">Manobo</a> (Western Bukidnon)</span>
+<span class="langcount">(1)</span><span class="langgroup"><a class="grouplink" href="x">WMP</a></span></p>
+<p class="formline"><a href="acd-n_f.htm#2376">labaih</a><span class="formdef">careless</span> (<a class="pformN" href="acd-n_f.htm#2376">NOISE</a>)</p>
+<p class="lbreak"></p>
+<a name="x"></a>
+</body></html>""",
+    'acd-s_q.htm': """\
+<html><body>
+<p class="setnum">27713</p>
+<!-- comment -->
+<table class="settable"><tr><td>
+<p class="setline"><span class="key">*qeCeŋ</span> <span class="setline"><a class="setline" href="x">obstruction</a>, barrier</span></p>
+<table class="entrytable"><tr><td class="entrytable">
+<p class="pidno">8001</p>
+<a name="qeCeN"></a>
+<p class="pLang"><span class="pcode">PAN</span> &nbsp; <span class="lineform">*qeCeŋ </span><span class="linegloss">obstruction, barrier</span>
+<span class="dbl">[doublet: <a href="acd-s_t.htm#5496">*tabuRiq</a>]</span></p>
+<table class="forms"><tbody>
+<tr valign="top"><td class="group">Formosan</td></tr>
+<tr valign="top"><td class="lg"><span class="brax">[</span><a href="acd-l_P.htm#P"><span class="lg">Paiwan</span></a></td>
+<td class="formuni">qetseŋ <span class="Met"><sup>&lt;M</sup></span></td><td class="gloss">barrier, fence<span class="brax">]</span></td></tr>
+<tr valign="top"><td class="lg">&nbsp;</td><td class="formuni">q2 <span class="hwnote">*i &gt; é</span></td><td class="gloss">b2</td></tr>
+</tbody></table>
+</td></tr></table>
+<p class="setnote"><span class="note">Note: &nbsp; </span>See <span class="bib"><a class="bib" href="acd-bib.htm#Egerod">Egerod (1965)</a></span> on <span class="lg">Atayal</span> <span class="wd">-an</span>.<br>x <a class="root" href="acd-r_b.htm#-baw₁"><span class="pwd">-baw₁</span></a></p>
+</td></tr></table>
+</body></html>""",
+    'acd-near.htm': """\
+<html><body>
+<table class="settableNear" align="center"><tbody><tr><td class="settable">
+<a name="nervous"></a>
+<a name="30724"></a>
+<p class="setline"><span class="keyloan"> nervous: &nbsp; anxious, nervous, restless</span></p>
+<p></p><table class="entrytable"><tbody><tr><td class="entrytable">
+<table class="loanforms" width="90%" align="center">
+<tbody><tr valign="top">
+<td class="group">WMP</td></tr>
+<tr valign="top"><td class="lgloan">Cebuano</td>
+<td class="formuniloan">balísa</td><td class="gloss">anxious, apprehensive</td></tr>
+<tr valign="top"><td class="lgloan">&nbsp;</td>
+<td class="formuniloan">balisa-balísa</td><td class="gloss">restless</td></tr>
+</tbody></table>
+</td></tr></tbody></table>
+<p class="setnote"><span class="lg">Malay</span> <span class="wd">bəlisah</span> points to *<span class="pwd">-q</span>.
+</p></td></tr></tbody></table>
+<p class="other">x</p>
+</body></html>""",
+    'acd-n_a.htm': """\
+<html><body>
+<table class="settableNoise" align="center"><tbody><tr><td class="settable">
+<a name="abundant"></a>
+<a name="1658"></a>
+<span class="lineloanform">(Dempwolff: *bun) </span>
+<p class="setline"><span class="keyNoise">abundant</span></p>
+<p></p><table class="entrytable"><tbody><tr><td class="entrytable">
+<table class="noiseforms" width="90%" align="center">
+<tbody><tr valign="top">
+<td class="group">WMP</td></tr>
+<tr valign="top"><td class="lgnoise">Malay</td>
+<td class="formuninoise">bun</td><td class="gloss">croupier at a Chinese gaming mat</td></tr>
+<tr valign="top">
+<td class="lgnoise">Toba Batak</td>
+<td class="formuninoise">bun</td><td class="gloss">abundant, of a bumper crop of rice</td></tr>
+</tbody></table>
+</td></tr></tbody></table>
+</td></tr></tbody></table>
+<!-- comment -->
+<table class="settableNoise" align="center"><tbody><tr><td class="settable">
+<a name="ant"></a>
+<a name="1659"></a>
+<p class="setline"><span class="keyNoise">ant</span></p>
+<table class="entrytable"><tbody><tr><td class="entrytable">
+<table class="noiseforms"><tbody>
+<tr valign="top"><td class="lgnoise">Malay</td>
+<td class="formuninoise">semut <span class="brax">[</span></td><td class="gloss">ant</td></tr>
+</tbody></table>
+</td></tr></tbody></table>
+<p class="setnote">Chance resemblance.</p>
+</td></tr></tbody></table>
+</body></html>""",
+    'acd-lo_a.htm': """\
+<html><body>
+<table class="settableLoan" align="center"><tbody><tr><td class="settable">
+<a name="appropriate"></a>
+<a name="30345"></a>
+<a name="app"></a>
+<span class="lineloanform">(Dempwolff: *patut ‘proper, fitting’) </span>
+<p class="setline"><span class="keyloan">appropriate: &nbsp; proper, fitting, appropriate</span></p>
+<p></p><table class="entrytable"><tbody><tr><td class="entrytable">
+<table class="loanforms" width="90%" align="center">
+<tbody><tr valign="top">
+<td class="group">WMP</td></tr>
+<tr valign="top"><td class="lgloan">Maranao</td>
+<td class="formuniloan">patot</td><td class="gloss">proper, fitting, due</td></tr>
+<tr valign="top">
+<td class="lgloan">Javanese</td>
+<td class="formuniloan">patut</td><td class="gloss">suitable, well-advised, appropriate</td></tr>
+</tbody></table>
+</td></tr></tbody></table>
+<p class="setnote">Borrowing from <span class="lg">Javanese</span>. <span class="bib"><a class="bib" href="acd-bib.htm#Dempwolff">Dempwolff (1938)</a></span> posited *<span class="pwd">patut</span>.
+</p></td></tr></tbody></table>
+</body></html>""",
+    'acd-r_b.htm': """\
+<html><body>
+<table class="settableR"><tr><td>
+<a name="-baj"></a>
+<p class="SetIdno">29829</p>
+<a name="29829"></a>
+<p class="setline"><span class="key">*-baj</span> <span class="setline">unravel, untie</span></p>
+<table class="formsR" width="90%" align="center">
+<tbody>
+<tr valign="top"><td class="group">WMP</td></tr>
+<tr valign="top"><td class="lgP">PWMP</td><td class="rootproto"><a class="rootproto" href="acd-s_b.htm#1">*ba(n)baj</a></td><td class="gloss">untie</td></tr>
+<tr valign="top"><td class="lg">Aklanon</td><td class="formuni">húbad</td><td class="gloss">untie, unravel</td></tr>
+</tbody></table>
+<p class="setnote"><span class="lg">Isneg</span> <span class="wd">ubād</span> 'untie' (expected **<span class="wd">ubag</span>) suggests that <span class="lg">Aklanon</span> <span class="wd">húbad</span> may not contain the root *<span class="pwd">-baj</span>.
+</p></td></tr></table>
+</body></html>""",
+    'acd-w_a.htm': """\
+<html><body>
+<p class="formline"><span class="FormHw">a</span>
+<span class="FormLg">Aklanon</span>
+<span class="FormGroup">(WMP)</span>
+<span class="FormGloss">exclamation of discovery; "ah" (with high intonation)</span> <span class="pLang">PMP </span> <a class="setword2" href="acd-s_a1.htm#380">*<span class="pForm">a₃</span></a></p>
+<p class="formline"><span class="FormPw">*abih</span><span class="FormPLg">PCha</span><span class="FormGroup">(WMP)</span> <span class="FormGloss">all</span> <span class="pLang">PWMP </span> <a class="setword2" href="acd-s_q.htm#4102">*<span class="pForm">qabiq</span></a></p>
+<p class="lbreak"></p>
+</body></html>""",
+}
+
+
+def _infer_protoforms(sets):
+    """
+    The set-based implementation of `lexibank_acd.infer_protoforms`, walking the proto-language
+    tree for each reconstruction.
+    """
+    descendants, nodes = collections.defaultdict(set), {}
+    for n in TREE.walk():
+        nodes[n.name] = n
+        descendants[n.name] = {nn.name for nn in n.walk()}
+    protoforms = {s['proto_language']: (s['key'], s['gloss']) for s in sets}
+    attested = set()
+    for s in sets:
+        attested |= {'P' + f['group'] for f in s['forms']}
+    for s in sets:
+        excluded = set()
+        for i, n in enumerate(nodes[s['proto_language']].walk()):
+            if i:
+                if n.name in excluded:
+                    continue
+                if n.name in protoforms:
+                    excluded |= descendants[n.name]
+                    continue
+                if any(pl in attested for pl in descendants[n.name]):
+                    yield s['id'], n.name, s['key'], s['gloss']
+
+
+def _set(pl, key, *groups):
+    return dict(
+        id='{}-{}'.format(pl, key),
+        proto_language=pl,
+        key=key,
+        gloss='six',
+        forms=[dict(group=g) for g in groups])
+
+
+@pytest.mark.parametrize(
+    'sets',
+    [
+        # PAN *enem, PEMP *onəm, POC *onom - with reflexes in all groups:
+        [
+            _set('PAN', 'enem', 'Form.', 'WMP', 'PH', 'CMP'),
+            _set('PEMP', 'onəm', 'SHWNG'),
+            _set('POC', 'onom', 'OC'),
+        ],
+        # Reflexes in a single group only:
+        [_set('PAN', 'enem', 'OC')],
+        [_set('PMP', 'enem', 'PH')],
+        # No reflexes below the reconstruction:
+        [_set('PAN', 'enem', 'Form.')],
+        [_set('POC', 'onom', 'OC')],
+        # Groups not in the tree:
+        [_set('PMP', 'enem', 'SHWNG', 'XX', '')],
+        # Explicit reconstructions in sister subtrees:
+        [
+            _set('PAN', 'enem', 'WMP', 'CMP', 'OC'),
+            _set('PWMP', 'anem', 'PH'),
+            _set('PCMP', 'enəm', 'CMP'),
+        ],
+        # Explicit reconstructions on one path, without intermediate reflexes:
+        [
+            _set('PMP', 'enem', 'WMP'),
+            _set('PCEMP', 'enəm'),
+            _set('PSHWNG', 'onəm', 'SHWNG'),
+        ],
+    ]
+)
+def test_infer_protoforms(sets):
+    assert list(infer_protoforms(sets)) == list(_infer_protoforms(sets))
+
+
+@pytest.mark.parametrize(
+    'parser',
+    [
+        SourceParser, LanguageParser, EtymonParser, NearParser, NoiseParser, LoanParser,
+        RootParser, WordParser,
+    ])
+def test_backends(parser, tmp_path):
+    for name, html in PAGES.items():
+        tmp_path.joinpath(name).write_text(html, encoding='utf8')
+
+    objects = {}
+    for backend in ['bs4', 'lxml']:
+        p = parser(tmp_path, backend=backend)
+        objects[backend] = [o for path in p.paths for o in p.objects(path)]
+    assert objects['bs4']
+    assert objects['bs4'] == objects['lxml']
+    assert json.dumps(objects['bs4'], cls=JsonEncoder) == \
+        json.dumps(objects['lxml'], cls=JsonEncoder)
+
+
+def test_RowSpool():
+    spool = RowSpool(annotate=lambda row: dict(row, Loan=row['ID'] == '2'))
+    assert not spool
+    row = dict(ID='1')
+    spool.append(row)
+    row['ID'] = 'x'  # Changes after appending are lost.
+    spool.extend([dict(ID='2'), dict(ID='3')])
+    assert len(spool) == 3
+    rows = iter(spool)
+    assert next(rows) == dict(ID='1', Loan=False)
+    spool.append(dict(ID='4'))  # Appending while iterating doesn't disturb the iteration.
+    assert [r['ID'] for r in rows] == ['2', '3']
+    assert [r['Loan'] for r in spool] == [False, True, False, False]
+
+
+class Table(list):
+    """
+    A CLDF table in memory, standing in for a `csvw.Table` of a `pycldf.Dataset`.
+    """
+    def __init__(self, cols, rows):
+        list.__init__(self, [dict(zip(cols, row)) for row in rows])
+        self.tableSchema = types.SimpleNamespace(
+            columns=[types.SimpleNamespace(name=col) for col in cols])
+
+
+@pytest.fixture
+def index():
+    # Etymon 1 with main reconstruction PMP *pa and a subset PMP *pa-pa, etymon 2 PAN *tu:
+    return cu.Index(dict(
+        LanguageTable=Table(
+            ['ID', 'Name', 'Abbr', 'Is_Proto'],
+            [('pan', 'PAN', 'PAN', True), ('pmp', 'PMP', 'PMP', True),
+             ('1', 'One', None, False), ('2', 'Two', None, False)]),
+        ParameterTable=Table(['ID', 'Name'], [('p1', 'leaf'), ('p2', 'leaves'), ('p3', 'stone')]),
+        FormTable=Table(
+            ['ID', 'Language_ID', 'Parameter_ID', 'Value', 'Form', 'Description', 'Cognacy'],
+            [('pmp-p1-1', 'pmp', 'p1', '*pa', '*pa', 'leaf', None),
+             ('1-p1-1', '1', 'p1', 'pa', 'pa', 'leaf', '10'),
+             ('2-p1-1', '2', 'p1', 'fa', 'fa', 'leaf', '10'),
+             ('pmp-p2-1', 'pmp', 'p2', '*pa-pa', '*pa-pa', 'leaves', None),
+             ('2-p2-1', '2', 'p2', 'fafa', 'fafa', 'leaves', '20'),
+             ('pan-p3-1', 'pan', 'p3', '*tu', '*tu', 'stone', None),
+             ('1-p3-1', '1', 'p3', 'tu', 'tu', 'stone', '30')]),
+        CognatesetTable=Table(
+            ['ID', 'Name', 'Form_ID', 'Etymon_ID', 'Is_Main_Entry', 'Comment'],
+            [('1', "PMP *pa 'leaf'", 'pmp-p1-1', '1', True, None),
+             ('1_2', "PMP *pa-pa 'leaves'", 'pmp-p2-1', '1', False, None),
+             ('2', "PAN *tu 'stone'", 'pan-p3-1', '2', True, None)]),
+        CognateTable=Table(
+            ['ID', 'Form_ID', 'Cognateset_ID'],
+            [('10', 'pmp-p1-1', '1'), ('11', '1-p1-1', '1'), ('12', '2-p1-1', '1'),
+             ('20', 'pmp-p2-1', '1_2'), ('21', '2-p2-1', '1_2'),
+             ('30', 'pan-p3-1', '2'), ('31', '1-p3-1', '2')]),
+        **{
+            'etyma.csv': Table(
+                ['ID', 'Name', 'Description', 'Initial', 'Comment'],
+                [('1', '*pa', 'leaf', 'p', 'A &ast;note.'), ('2', '*tu', 'stone', 't', None)]),
+            'cf.csv': Table(['ID', 'Name', 'Description', 'Category', 'Cognateset_ID'], []),
+            'cfitems.csv': Table(['ID', 'Cfset_ID', 'Form_ID'], []),
+        }), 'test')
+
+
+def _apply(index, *ops):
+    return [str(e) for _, _, e in cu.apply(index, [(str(i), op) for i, op in enumerate(ops)])]
+
+
+def _members(index, csid):
+    return sorted(index.members[csid])
+
+
+def test_AddWord(index):
+    assert not _apply(
+        index,
+        cu.AddWord(entry='1', language_id='1', word_form='pa2', gloss='leaf'),
+        cu.AddWord(entry='1#s-20', language_id='1', word_form='paa', gloss='new'),
+        # An existing word is added to the entry:
+        cu.AddWord(entry='2', language_id='2', word_form='fa', gloss='leaf'))
+    # New forms are numbered per language and parameter:
+    form = index.rows['FormTable']['1-p1-2']
+    assert form['Value'] == 'pa2' and form['Cognacy'] == '10'
+    pid = index.parameters['new']
+    assert index.rows['ParameterTable'][pid]['Name'] == 'new'
+    assert '1-{}-1'.format(pid) in index.members['1_2']
+    assert index.rows['FormTable']['2-p1-1']['Cognacy'] == '10 30'
+    assert _apply(index, cu.AddWord(entry='1', language_id='1', word_form='pa2', gloss='leaf')) \
+        == ['word 1-p1-2 already in entry 1']
+
+
+def test_AddParentEntry(index):
+    assert not _apply(index, cu.AddParentEntry(
+        entry='1', form='*lapa', gloss='foliage', language_id='2', word_form='fa',
+        word_id='p1-1', previous_entry='1'))
+    cs = index.main_cognateset('1')
+    assert cs['ID'] == '1_3' and not index.rows['CognatesetTable']['1']['Is_Main_Entry']
+    form = index.rows['FormTable'][cs['Form_ID']]
+    assert form['Language_ID'] == 'pan' and cs['Name'] == "PAN *lapa 'foliage'"
+    assert index.rows['etyma.csv']['1']['Initial'] == 'l'
+    # The word was moved to the new main reconstruction:
+    assert _members(index, '1_3') == ['2-p1-1', cs['Form_ID']]
+    assert _members(index, '1') == ['1-p1-1', 'pmp-p1-1']
+    # There is no level above PAN:
+    assert _apply(index, cu.AddParentEntry(entry='2', form='*ta', gloss='x')) == \
+        ['no parent level for PAN']
+
+
+def test_ChangeReconstruction(index):
+    assert not _apply(
+        index,
+        cu.ChangeReconstruction(entry='1', form='*lapa'),
+        cu.ChangeReconstruction(entry='1#s-20', gloss='foliage'))
+    assert index.rows['etyma.csv']['1']['Initial'] == 'l'
+    assert index.rows['CognatesetTable']['1_2']['Name'] == "PMP *pa-pa 'foliage'"
+
+
+def test_ChangeWord(index):
+    assert _apply(index, cu.ChangeWord(
+        entry='1', language_id='1', word_id='p1-1', old_form='px', new_form='paa')) == \
+        ['word 1-p1-1: expected "px", found "pa"']
+    assert not _apply(index, cu.ChangeWord(
+        entry='1', language_id='1', word_id='p1-1', old_form='pa', new_form='paa', new_gloss='x'))
+    assert index.rows['FormTable']['1-p1-1']['Form'] == 'paa'
+
+
+def test_DeleteWord(index):
+    assert not _apply(index, cu.DeleteWord(entry='1', language_id='1', word_id='p1-1'))
+    assert index.rows['FormTable']['1-p1-1']['Cognacy'] is None
+    assert '11' not in index.rows['CognateTable']
+
+
+def test_MoveWord(index):
+    assert not _apply(index, cu.MoveWord(
+        language_id='1', word_id='p1-1', entry='1', new_entry='2'))
+    assert index.rows['FormTable']['1-p1-1']['Cognacy'] == '30'
+    assert index.rows['CognateTable']['11']['Cognateset_ID'] == '2'
+
+
+def test_MoveToNear_MoveToChance(index):
+    assert not _apply(
+        index,
+        cu.MoveToNear(language_id='1', word_id='p1-1', entry='1', concept='leaf', cognate_set='1'),
+        cu.MoveToChance(language_id='2', word_id='p1-1', entry='1', gloss='leaf'))
+    assert [r['Category'] for r in index.rows['cf.csv'].values()] == ['near', 'noise']
+    assert list(index.cfitems['Near-test-1']) == ['1-p1-1']
+    assert _members(index, '1') == ['pmp-p1-1']
+
+
+def test_notes(index):
+    assert not _apply(
+        index,
+        cu.AddNote(entry='2', note='See *pa.'),
+        cu.ChangeNote(entry='1', prepend='Old', delete='A *note.', append='new *note'),
+        cu.MoveNote(entry='2', new_entry='1#s-20'))
+    assert index.rows['etyma.csv']['1']['Comment'] == 'Old new &ast;note'
+    assert index.rows['etyma.csv']['2']['Comment'] is None
+    assert index.rows['CognatesetTable']['1_2']['Comment'] == 'See &ast;pa.'
+
+
+def test_DeleteEntry(index):
+    assert _apply(index, cu.DeleteEntry(entry='1#s-10')) == \
+        ['cannot delete main reconstruction 10 of entry 1']
+    assert not _apply(index, cu.DeleteEntry(entry='2'), cu.DeleteEntry(entry='1#s-20'))
+    # Orphaned reconstructions are deleted, reflexes are kept:
+    assert 'pan-p3-1' not in index.rows['FormTable']
+    assert 'pmp-p2-1' not in index.rows['FormTable']
+    assert index.rows['FormTable']['1-p3-1']['Cognacy'] is None
+    assert '2' not in index.rows['etyma.csv'] and '1_2' not in index.rows['CognatesetTable']
+    assert '31' not in index.rows['CognateTable']
+
+
+def test_conflicts(index):
+    forms = len(index.rows['FormTable'])
+    assert _apply(
+        index,
+        # Missing targets:
+        cu.AddWord(entry='9', language_id='1', word_form='x', gloss='x'),
+        cu.AddWord(entry='1#s-30', language_id='1', word_form='x', gloss='x'),
+        cu.DeleteWord(entry='1', language_id='1', word_id='p9-1'),
+        cu.DeleteWord(entry='2', language_id='1', word_id='p1-1'),
+        cu.MoveWord(language_id='1', word_id='p1-1', entry='1', new_entry='9'),
+        # Destination deleted in the batch:
+        cu.AddWord(entry='2', language_id='1', word_form='x', gloss='x'),
+        cu.DeleteEntry(entry='2'),
+        # Empty required fields:
+        cu.AddNote(entry='', note='x'),
+        cu.MoveWord(language_id='1', word_id='p1-1', entry='1', new_entry=None),
+        cu.MiscChange(entry='1', instruction='Fix it.'),
+    ) == [
+        'entry 9 not found',
+        'reconstruction 30 not in entry 1',
+        'word 1-p9-1 not found',
+        'word 1-p1-1 not in entry 2',
+        'entry 9 not found',
+        'entry 2 is deleted in this batch',
+        'no value for Entry ID',
+        'no value for New Entry ID',
+        'manual edit required: Fix it.',
+    ]
+    # Conflicts leave the data unchanged:
+    assert len(index.rows['FormTable']) == forms - 1  # Only the orphaned reconstruction *tu.
+    assert _members(index, '1') == ['1-p1-1', '2-p1-1', 'pmp-p1-1']